@@ -113,17 +113,12 @@ def process_and_clean_sheet_data(sheet_key, batch_size=100000, store_original=Tr
         supabase_manager.create_original_table('clients_2025', config['identifier'])
     
     # Step 3: Clear existing data
-    safe_table_name = 'clients_2025'.lower().replace(' ', '_').replace('-', '_')
-    included_table = f"{safe_table_name}_{config['identifier']}_included"
-    excluded_table = f"{safe_table_name}_{config['identifier']}_excluded"
-    
     print("Clearing existing data...")
-    supabase_manager.client.table(included_table).delete().neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
-    supabase_manager.client.table(excluded_table).delete().neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
+    supabase_manager.clear_table('clients_2025', config['identifier'], 'included')
+    supabase_manager.clear_table('clients_2025', config['identifier'], 'excluded')
     
     if store_original:
-        original_table = f"{safe_table_name}_{config['identifier']}_original"
-        supabase_manager.client.table(original_table).delete().neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
+        supabase_manager.clear_table('clients_2025', config['identifier'], 'original')
     
     # Step 4: Process in batches
     total_included = 0
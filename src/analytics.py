@@ -2,6 +2,7 @@ import os
 from supabase import create_client, Client
 from typing import List, Dict, Any, Optional
 import logging
+from .supabase_data import sheet_table_name
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,15 +18,21 @@ class AnalyticsEngine:
         self.client: Client = create_client(self.url, self.key)
         logger.info("Supabase client initialized successfully")
 
-    def _safe_table_name(self, table_name: str, sheet_identifier: str, table_type: str) -> str:
-        return f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_{table_type}"
-
     def get_dataset_sizes(self, table_name: str, sheet_identifier: str) -> Dict[str, Any]:
-        included_table = self._safe_table_name(table_name, sheet_identifier, 'included')
-        excluded_table = self._safe_table_name(table_name, sheet_identifier, 'excluded')
+        included_table = sheet_table_name(table_name, sheet_identifier, 'included')
+        excluded_table = sheet_table_name(table_name, sheet_identifier, 'excluded')
 
-        included_count = self.client.table(included_table).select("*", count="exact").execute().count or 0
-        excluded_count = self.client.table(excluded_table).select("*", count="exact").execute().count or 0
+        # Both counts in one round trip; fall back to a count per table if the RPC isn't installed
+        try:
+            counts = self.client.rpc('sheet_counts', {
+                'included_tbl': included_table,
+                'excluded_tbl': excluded_table
+            }).execute().data or {}
+            included_count = counts.get('included', 0)
+            excluded_count = counts.get('excluded', 0)
+        except Exception:
+            included_count = self.client.table(included_table).select("*", count="exact").execute().count or 0
+            excluded_count = self.client.table(excluded_table).select("*", count="exact").execute().count or 0
         original_count = included_count + excluded_count
 
         return {
@@ -37,7 +44,7 @@ class AnalyticsEngine:
         }
 
     def get_uniqueness_metrics(self, table_name: str, sheet_identifier: str) -> Dict[str, Any]:
-        table = self._safe_table_name(table_name, sheet_identifier, 'included')
+        table = sheet_table_name(table_name, sheet_identifier, 'included')
 
         # SQL aggregation for uniqueness
         query_unique_names = f"SELECT COUNT(DISTINCT name) as unique_names FROM {table};"
@@ -60,7 +67,7 @@ class AnalyticsEngine:
         return result
 
     def get_birth_year_distribution(self, table_name: str, sheet_identifier: str) -> List[Dict[str, Any]]:
-        table = self._safe_table_name(table_name, sheet_identifier, 'included')
+        table = sheet_table_name(table_name, sheet_identifier, 'included')
         query = f"""
             SELECT birth_year as year, COUNT(*) as count
             FROM {table}
@@ -71,7 +78,7 @@ class AnalyticsEngine:
         return res.data or []
 
     def get_birth_month_distribution(self, table_name: str, sheet_identifier: str) -> List[Dict[str, Any]]:
-        table = self._safe_table_name(table_name, sheet_identifier, 'included')
+        table = sheet_table_name(table_name, sheet_identifier, 'included')
         query = f"""
             SELECT birth_month as month, COUNT(*) as count
             FROM {table}
@@ -84,7 +91,7 @@ class AnalyticsEngine:
         return [{'month': r['month'], 'month_name': month_names.get(r['month'], 'Unknown'), 'count': r['count']} for r in res.data or []]
 
     def get_exclusion_reasons(self, table_name: str, sheet_identifier: str) -> List[Dict[str, Any]]:
-        table = self._safe_table_name(table_name, sheet_identifier, 'excluded')
+        table = sheet_table_name(table_name, sheet_identifier, 'excluded')
         # Split and count reasons directly in SQL using string functions if supported, otherwise fetch counts
         query = f"""
             SELECT exclusion_reason, COUNT(*) as count
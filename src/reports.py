@@ -20,7 +20,11 @@ class ReportGenerator:
         'host': "aws-1-eu-west-1.pooler.supabase.com",
         'port': "5432",
         'dbname': "postgres",
-        'sslmode': 'require'
+        'sslmode': 'require',
+        'application_name': 'cleaning_pipeline_reports',
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10
     }
     
     def __init__(self):
@@ -8,14 +8,45 @@ ENHANCED - Added parallel fetching and database-level analytics
 
 import os
 from supabase import create_client, Client
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Sized, Union
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice, chain
 import time
+import heapq
+import random
 import uuid
 import re
+import io
+from functools import lru_cache, wraps
+from operator import itemgetter
 from dotenv import load_dotenv
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager, asynccontextmanager
 import psycopg2
+import psycopg2.pool
+import psycopg2.extras
+from psycopg2 import sql
+import httpx
+import json
+import asyncio
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,20 +61,363 @@ DB_CONFIG = {
     'host': os.getenv('DB_HOST'),
     'port': os.getenv('DB_PORT', '5432'),
     'dbname': os.getenv('DB_NAME', 'postgres'),
-    'sslmode': 'require'
+    'sslmode': 'require',
+    'application_name': 'cleaning_pipeline',
+    # TCP keepalives so idle pooled connections aren't silently dropped by NAT/load balancers
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10
 }
 
+# Supabase's transaction pooler (PgBouncer) listens on 6543; sessions are not kept
+# between transactions there, so session-level PREPARE can't be reused
+TRANSACTION_POOLER = str(DB_CONFIG['port']) == '6543'
+
+# Batches at least this large are loaded with COPY instead of INSERT ... VALUES
+COPY_MIN_ROWS = 1000
+
+# Keep REST insert bodies under PostgREST's request size limit (1 MiB) with some headroom
+MAX_REST_PAYLOAD_BYTES = 900_000
+
+# Rows per call when reading through the get_all_rows RPC
+RPC_PAGE_SIZE = 10000
+
+# Columns the paginated getters select by default (created_at and the excluded table's id are rarely needed)
+ORIGINAL_COLUMNS = ('row_id', 'original_row_number', 'firstname', 'birthday', 'birthmonth', 'birthyear')
+INCLUDED_COLUMNS = ('row_id', 'original_row_number', 'name', 'birth_day', 'birth_month', 'birth_year')
+EXCLUDED_COLUMNS = ('row_id', 'original_row_number', 'original_name', 'original_birth_day',
+                    'original_birth_month', 'original_birth_year', 'exclusion_reason')
+
+# INTEGER columns of the sheet tables; the rest (TEXT, UUID, timestamps) are read into Arrow as strings
+ARROW_INT_COLUMNS = frozenset({'id', 'original_row_number', 'birth_day', 'birth_month', 'birth_year'})
+
+# Server-side helper functions, (re)created alongside the sheet tables
+RPC_FUNCTIONS_SQL = """
+CREATE OR REPLACE FUNCTION get_all_rows(tbl text, after_row_number integer DEFAULT -1, lim integer DEFAULT 10000)
+RETURNS json
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    result json;
+BEGIN
+    -- One JSON array per call, so PostgREST's max-rows cap does not apply
+    EXECUTE format(
+        'SELECT COALESCE(json_agg(t ORDER BY t.original_row_number), ''[]''::json)
+         FROM (SELECT * FROM %I WHERE original_row_number > $1
+               ORDER BY original_row_number LIMIT $2) t',
+        tbl)
+    INTO result
+    USING after_row_number, lim;
+    RETURN result;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION page_bounds(tbl text, page_size integer DEFAULT 1000)
+RETURNS json
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    result json;
+BEGIN
+    -- First original_row_number of every page_size-row page, in one pass over the index
+    EXECUTE format(
+        'SELECT COALESCE(json_agg(original_row_number ORDER BY original_row_number), ''[]''::json)
+         FROM (SELECT original_row_number,
+                      row_number() OVER (ORDER BY original_row_number) AS position
+               FROM %I) p
+         WHERE (position - 1) %% $1 = 0',
+        tbl)
+    INTO result
+    USING page_size;
+    RETURN result;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sheet_counts(included_tbl text, excluded_tbl text)
+RETURNS json
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    result json;
+BEGIN
+    -- Both row counts of a sheet in one call
+    EXECUTE format(
+        'SELECT json_build_object(''included'', (SELECT COUNT(*) FROM %I),
+                                  ''excluded'', (SELECT COUNT(*) FROM %I))',
+        included_tbl, excluded_tbl)
+    INTO result;
+    RETURN result;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION sheet_stats(tbl text, col text)
+RETURNS json
+LANGUAGE plpgsql STABLE
+AS $$
+DECLARE
+    result json;
+BEGIN
+    -- Value/count pairs for one column, aggregated server-side
+    EXECUTE format(
+        'SELECT COALESCE(json_agg(json_build_object(''value'', v, ''count'', c) ORDER BY v), ''[]''::json)
+         FROM (SELECT %I AS v, COUNT(*) AS c FROM %I GROUP BY 1) s',
+        col, tbl)
+    INTO result;
+    RETURN result;
+END;
+$$;
+"""
+
+# Included-table columns that get_included_stats may group by
+STATS_COLUMNS = ('birth_day', 'birth_month', 'birth_year')
+
+
+# Anything outside [a-z0-9_] in a base table name collapses to a single underscore
+_SANITIZE_RE = re.compile(r'[^a-z0-9_]+')
+
+
+@lru_cache(maxsize=1024)
+def sheet_table_name(table_name: str, sheet_identifier: str, table_type: str) -> str:
+    """Build the physical table name for a sheet, e.g. ('Clients 2025', 'jan', 'included') -> clients_2025_jan_included"""
+    return f"{_SANITIZE_RE.sub('_', table_name.lower())}_{sheet_identifier}_{table_type}"
+
+
+def _iter_batches(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Yield successive lists of up to batch_size rows without materializing the whole input"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _json_dumps(payload: Any) -> bytes:
+    """Serialize a request body with orjson when available (several times faster than json)"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(content: bytes) -> Any:
+    """Parse a response body with orjson when available (several times faster than json)"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _row_id_key(row: Dict[str, Any]) -> str:
+    """Sort key for primary key order; str() keeps None and mixed str/UUID row_ids comparable"""
+    return str(row['row_id'])
+
+
+def _iter_row_tuples(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Iterator[tuple]:
+    """Lazily pull rows out as positional tuples in column order with one itemgetter call per row"""
+    getter = itemgetter(*columns)
+    if len(columns) == 1:
+        return ((getter(row),) for row in rows)
+    return map(getter, rows)
+
+
+def _row_tuples(rows: Iterable[Dict[str, Any]], columns: List[str]) -> List[tuple]:
+    """Pull rows out as a list of positional tuples in column order"""
+    return list(_iter_row_tuples(rows, columns))
+
+
+def _arrow_type(column: str) -> 'pa.DataType':
+    """Arrow type of a sheet-table column: INTEGER columns are int64, everything else text"""
+    return pa.int64() if column in ARROW_INT_COLUMNS else pa.string()
+
+
+def _arrow_from_rows(rows: List[Dict[str, Any]]) -> 'pa.Table':
+    """Build an Arrow table from row dictionaries (an empty table for no rows)"""
+    if not rows:
+        return pa.table({})
+    return pa.Table.from_pylist(rows, schema=pa.schema([(column, _arrow_type(column)) for column in rows[0]]))
+
+
+def _arrow_from_csv(content: bytes) -> 'pa.Table':
+    """
+    Parse a PostgREST text/csv page with the sheet-table column types
+    
+    Types come from the schema instead of per-page inference, so TEXT values
+    such as "05" keep their leading zeros and every page agrees on a column's
+    type. Empty fields are NULL, as in the JSON responses (an empty string
+    reads back as NULL too, since the CSV can't tell them apart).
+    """
+    header = [column.strip('"') for column in content.split(b'\n', 1)[0].decode().strip().split(',')]
+    return pa_csv.read_csv(
+        io.BytesIO(content),
+        read_options=pa_csv.ReadOptions(block_size=1 << 20),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={column: _arrow_type(column) for column in header},
+            # Only an empty field is NULL; pyarrow's defaults would also null out values like "N/A"
+            null_values=[''],
+            strings_can_be_null=True
+        )
+    )
+
+
+def _copy_text_value(value: Any) -> str:
+    """Encode a value for PostgreSQL's COPY text format (NULL is \\N, specials backslash-escaped)"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class LazyRowList(Sequence):
+    """
+    Read-only list of row dictionaries backed by a pyarrow.Table
+    
+    Rows stay columnar in Arrow buffers; a dict is only built for the row
+    being indexed, and iteration converts one record batch at a time.
+    """
+    
+    def __init__(self, table: 'pa.Table'):
+        self.table = table
+    
+    def __len__(self) -> int:
+        return self.table.num_rows
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return LazyRowList(self.table.slice(start, max(0, stop - start)))
+        
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("row index out of range")
+        return {name: column[index].as_py() for name, column in zip(self.table.column_names, self.table.columns)}
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for batch in self.table.to_batches():
+            yield from batch.to_pylist()
+
+
+class TableMissing(Exception):
+    """Raised when PostgREST reports that a table does not exist (never worth retrying)"""
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """True for dropped/reset connections, which are worth retrying on a fresh connection"""
+    if isinstance(error, TableMissing):
+        return False
+    if isinstance(error, (ConnectionError, httpx.TransportError, psycopg2.OperationalError)):
+        return True
+    error_str = str(error)
+    return 'WinError 10054' in error_str or 'connection' in error_str.lower()
+
+
+def _is_missing_function(error: Exception) -> bool:
+    """True when PostgREST reports that an RPC function is not installed (PGRST202)"""
+    error_str = str(error)
+    return 'PGRST202' in error_str or 'not find the function' in error_str
+
+
+def _retry_with_backoff(max_attempts: int = 3, initial: float = 0.5, maximum: float = 8.0,
+                        retry_if=_is_connection_error):
+    """
+    Retry the decorated call with jittered exponential backoff
+    
+    The n-th retry waits initial * 2**n plus up to ``initial`` of random jitter,
+    capped at ``maximum``, so clients hit by the same reset don't retry in step.
+    Errors for which ``retry_if`` is false are raised immediately.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    if attempt == max_attempts - 1 or not retry_if(e):
+                        raise
+                    delay = min(maximum, initial * 2 ** attempt + random.uniform(0, initial))
+                    logger.warning(f"{func.__name__} failed, retrying in {delay:.1f}s "
+                                   f"(attempt {attempt + 1}/{max_attempts}): {e}")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
+
+
+class _RetryBatch(Exception):
+    """Raised by an insert attempt that should be retried once its backoff delay has passed"""
+    
+    def __init__(self, delay: float):
+        super().__init__(f"retry in {delay}s")
+        self.delay = delay
+
+
+class _AdaptiveLimiter:
+    """
+    Concurrency limit for async requests that tunes itself from observed latency
+    
+    Every ``window`` completions it compares p95 to p50 latency: a tight spread
+    means the server keeps up, so one more request may run; a wide spread means
+    requests are queueing, so one fewer may run.
+    """
+    
+    def __init__(self, initial: int, minimum: int, maximum: int, window: int = 16):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.capacity = max(self.minimum, min(initial, self.maximum))
+        self.window = window
+        self._in_use = 0
+        self._latencies = []
+        self._condition = asyncio.Condition()
+    
+    @asynccontextmanager
+    async def slot(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_use < self.capacity)
+            self._in_use += 1
+        
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            latency = time.perf_counter() - start
+            async with self._condition:
+                self._in_use -= 1
+                self._record(latency)
+                self._condition.notify_all()
+    
+    def _record(self, latency: float) -> None:
+        self._latencies.append(latency)
+        if len(self._latencies) < self.window:
+            return
+        
+        ordered = sorted(self._latencies)
+        self._latencies.clear()
+        p50 = ordered[len(ordered) // 2]
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        if p50 <= 0:
+            return
+        
+        spread = p95 / p50
+        if spread < 2 and self.capacity < self.maximum:
+            self.capacity += 1
+        elif spread > 4 and self.capacity > self.minimum:
+            self.capacity -= 1
+
 
 class SupabaseManager:
     """Manages all Supabase database operations"""
     
-    def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None):
+    def __init__(self, supabase_url: Optional[str] = None, supabase_key: Optional[str] = None,
+                 max_connections: int = 32, max_db_connections: int = 10):
         """
         Initialize Supabase client
         
         Args:
             supabase_url: Supabase project URL (defaults to env var SUPABASE_URL)
             supabase_key: Supabase API key (defaults to env var SUPABASE_KEY)
+            max_connections: Size of the shared keep-alive HTTP connection pool used for inserts
+            max_db_connections: Size of the direct PostgreSQL connection pool (DB_CONFIG), and the
+                cap on concurrent insert requests across all upload calls
         """
         self.url = supabase_url or os.getenv('SUPABASE_URL')
         self.key = supabase_key or os.getenv('SUPABASE_KEY')
@@ -52,25 +426,131 @@ class SupabaseManager:
             raise ValueError("Supabase URL and KEY must be provided or set in environment variables")
         
         self.client: Client = create_client(self.url, self.key)
+        
+        # Shared HTTP/2 keep-alive client for PostgREST inserts and page reads (thread-safe)
+        self._rest_url = f"{self.url.rstrip('/')}/rest/v1"
+        self._auth_headers = {
+            'apikey': self.key,
+            'Authorization': f"Bearer {self.key}",
+        }
+        self._http = httpx.Client(
+            base_url=self._rest_url,
+            headers=self._auth_headers,
+            http2=True,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+        
+        # Direct PostgreSQL pool, created on first use so the REST-only setup still works
+        self.direct_db = bool(DB_CONFIG.get('host'))
+        self.max_db_connections = max_db_connections
+        self._db_pool: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+        self._db_pool_lock = threading.Lock()
+        
+        # Caps concurrent database work across every call on this manager, however many
+        # executors are running; also keeps ThreadedConnectionPool from raising when exhausted
+        self._db_slots = threading.BoundedSemaphore(max_db_connections)
+        
+        # One Supabase client per worker thread, reused across batches and retries
+        self._thread_local = threading.local()
+        
+        # Read full tables through the get_all_rows RPC until it proves unavailable
+        self.use_rpc_fetch = True
         logger.info("Supabase client initialized successfully")
     
+    def _thread_client(self) -> Client:
+        """Return this thread's Supabase client, creating it on first use"""
+        client = getattr(self._thread_local, 'client', None)
+        if client is None:
+            client = create_client(self.url, self.key)
+            self._thread_local.client = client
+        return client
+    
+    @contextmanager
+    def _db_connection(self):
+        """
+        Borrow a connection from the direct PostgreSQL pool
+        
+        Blocks while max_db_connections connections are already borrowed.
+        Commits when the block exits cleanly, rolls back on error, and always
+        returns the connection to the pool.
+        """
+        if self._db_pool is None:
+            with self._db_pool_lock:
+                if self._db_pool is None:
+                    # putconn closes any connection returned beyond minconn idle ones, so keep
+                    # the whole pool open or concurrent batches reconnect on almost every call
+                    self._db_pool = psycopg2.pool.ThreadedConnectionPool(
+                        minconn=self.max_db_connections, maxconn=self.max_db_connections, **DB_CONFIG
+                    )
+        
+        with self._db_slots:
+            connection = self._db_pool.getconn()
+            try:
+                yield connection
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            finally:
+                self._db_pool.putconn(connection)
+    
+    def _wait_for_schema(self, *tables: str, timeout: float = 5.0) -> bool:
+        """
+        Poll until PostgREST's schema cache exposes the given tables
+        
+        Backs off exponentially from 10 ms to 200 ms; a reload normally lands
+        well under 500 ms, so this replaces a fixed sleep.
+        
+        Args:
+            tables: Physical table names to check
+            timeout: Give up after this many seconds
+        
+        Returns:
+            bool: True if every table became visible before the timeout
+        """
+        deadline = time.time() + timeout
+        delay = 0.01
+        pending = list(tables)
+        
+        while pending:
+            try:
+                self.client.table(pending[0]).select('row_id').limit(0).execute()
+                pending.pop(0)
+                continue
+            except Exception as e:
+                if time.time() >= deadline:
+                    logger.warning(f"Schema cache still missing {pending[0]} after {timeout:.1f}s: {e}")
+                    return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        
+        return True
+    
     # =========================
     # ORIGINAL DATA METHODS (Optional - for audit trail)
     # =========================
     
-    def create_original_table(self, table_name: str, sheet_identifier: str) -> bool:
+    def create_original_table(self, table_name: str, sheet_identifier: str, staging: bool = False) -> bool:
         """
         Create table for original (unprocessed) data
         
+        With staging=True an empty UNLOGGED ``<original>_staging`` copy is created
+        as well. Loading into it skips WAL entirely; publish_original_table then
+        swaps it in. A crash mid-load empties an unlogged table, so the load is
+        re-run from the start into the empty table.
+        
         Args:
             table_name: Base name for the tables
             sheet_identifier: Identifier for the sheet (e.g., 'jan', 'apr')
+            staging: Also (re)create the unlogged staging table
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = table_name.lower().replace(' ', '_').replace('-', '_')
-        original_table = f"{safe_table_name}_{sheet_identifier}_original"
+        original_table = sheet_table_name(table_name, sheet_identifier, 'original')
+        staging_table = f"{original_table}_staging"
         
         try:
             original_sql = f"""
@@ -87,16 +567,27 @@ class SupabaseManager:
             CREATE INDEX IF NOT EXISTS idx_{original_table}_row_number 
             ON {original_table}(original_row_number);
             """
-    
             
-            self.client.rpc('execute_sql', {'query': original_sql}).execute()
-            logger.info(f"Created/verified table: {original_table}")
+            if staging:
+                original_sql += f"""
+                DROP TABLE IF EXISTS {staging_table};
+                CREATE UNLOGGED TABLE {staging_table} (
+                    LIKE {original_table} INCLUDING ALL EXCLUDING INDEXES,
+                    PRIMARY KEY (row_id)
+                );
+                
+                CREATE INDEX idx_{staging_table}_row_number 
+                ON {staging_table}(original_row_number);
+                """
             
-            # Refresh schema
-            self.client.rpc('refresh_schema').execute()
+            original_sql += "NOTIFY pgrst, 'reload schema';"
             
-            # Wait for PostgREST to update its schema cache
-            time.sleep(2)  # Give PostgREST time to reload schema
+            # DDL and the PostgREST schema reload go out in a single round trip
+            self.client.rpc('execute_sql', {'query': original_sql}).execute()
+            logger.info(f"Created/verified table: {original_table}" + (f" (staging: {staging_table})" if staging else ""))
+            
+            tables = (original_table, staging_table) if staging else (original_table,)
+            self._wait_for_schema(*tables)
             logger.info(f"Schema cache refreshed for {original_table}")
             
             return True
@@ -106,7 +597,8 @@ class SupabaseManager:
             raise
     
     def append_original_data(self, table_name: str, sheet_identifier: str, data: List[Dict[str, Any]], 
-                            batch_size: int = 5000, max_workers: int = 5) -> bool:
+                            batch_size: int = 5000, max_workers: int = 5, engine: str = 'default',
+                            staging: bool = False) -> bool:
         """
         Append original data to Supabase (optional - for audit trail)
         
@@ -116,57 +608,57 @@ class SupabaseManager:
             data: List of dictionaries containing the original data
             batch_size: Number of rows per batch
             max_workers: Number of parallel workers
+            engine: 'asyncpg' loads the rows with one binary COPY, falling back to the default path if unavailable
+            staging: Load into the unlogged staging table from create_original_table(staging=True)
+        
+        Returns:
+            bool: True if successful
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'original')
+        if staging:
+            safe_table_name = f"{safe_table_name}_staging"
+        return self._bulk_upload(safe_table_name, data, batch_size, max_workers, 'original', engine=engine)
+    
+    def publish_original_table(self, table_name: str, sheet_identifier: str) -> bool:
+        """
+        Swap a loaded staging table in as the original table
+        
+        The staging table is switched to LOGGED (one sequential WAL write of the
+        finished table), the old original table is dropped, and the staging
+        table and its index take over the original names, all in one call.
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_original"
+        original_table = sheet_table_name(table_name, sheet_identifier, 'original')
+        staging_table = f"{original_table}_staging"
         
         try:
-            if not data:
-                logger.warning("No data to insert")
-                return True
-            
-            total_rows = len(data)
-            logger.info(f"Appending {total_rows:,} rows to {safe_table_name}...")
-            
-            # Create batches
-            batches = []
-            for i in range(0, total_rows, batch_size):
-                batch = data[i:i + batch_size]
-                batches.append((i // batch_size, batch))
-            
-            total_batches = len(batches)
-            
-            # Process batches in parallel
-            total_inserted = 0
-            total_failed = 0
-            completed_batches = 0
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {
-                    executor.submit(self._insert_batch, safe_table_name, batch, batch_num): batch_num
-                    for batch_num, batch in batches
-                }
-                
-                for future in as_completed(future_to_batch):
-                    batch_num, rows_inserted, rows_failed = future.result()
-                    total_inserted += rows_inserted
-                    total_failed += rows_failed
-                    completed_batches += 1
-            
-            elapsed = time.time() - start_time
-            logger.info(f"✓ Appended {total_inserted:,} rows in {elapsed:.1f}s")
+            publish_sql = f"""
+            ALTER TABLE {staging_table} SET LOGGED;
+            DROP TABLE IF EXISTS {original_table};
+            ALTER TABLE {staging_table} RENAME TO {original_table};
+            ALTER INDEX idx_{staging_table}_row_number RENAME TO idx_{original_table}_row_number;
+            NOTIFY pgrst, 'reload schema';
+            """
+            self.client.rpc('execute_sql', {'query': publish_sql}).execute()
+            logger.info(f"Published {staging_table} as {original_table}")
             
+            self._wait_for_schema(original_table)
             return True
         
         except Exception as e:
-            logger.error(f"Error appending original data: {str(e)}")
+            logger.error(f"Error publishing original table: {str(e)}")
             raise
     
     def get_original_data(self, table_name: str, sheet_identifier: str, 
-                         limit: Optional[int] = None, offset: Optional[int] = 0) -> List[Dict[str, Any]]:
+                         limit: Optional[int] = None, offset: Optional[int] = 0,
+                         after_row_number: Optional[int] = None,
+                         columns: Optional[Iterable[str]] = ORIGINAL_COLUMNS) -> List[Dict[str, Any]]:
         """
         Retrieve original data from Supabase with pagination
         
@@ -174,17 +666,24 @@ class SupabaseManager:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             limit: Maximum number of rows to retrieve
-            offset: Number of rows to skip
+            offset: Number of rows to skip (ignored when after_row_number is given)
+            after_row_number: Keyset cursor - return rows after this original_row_number
+            columns: Columns to return, or None for every column
         
         Returns:
             List of dictionaries containing the data
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_original"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'original')
         
         try:
-            query = self.client.table(safe_table_name).select("*").order('original_row_number')
-            
-            if offset:
+            select = ','.join(columns) if columns else '*'
+            query = self.client.table(safe_table_name).select(select).order('original_row_number')
+            
+            if after_row_number is not None:
+                query = query.gt('original_row_number', after_row_number)
+                if limit:
+                    query = query.limit(limit)
+            elif offset:
                 query = query.range(offset, offset + limit - 1 if limit else 999999)
             elif limit:
                 query = query.limit(limit)
@@ -209,78 +708,509 @@ class SupabaseManager:
         Returns:
             List of all dictionaries containing the data
         """
-        table_name = f"{project_name}_{identifier}_original"
-    
-        all_data = []
-        offset = 0
-        batch_size = 1000  # Supabase pagination limit
-            
-        while True:
-            response = self.client.table(table_name)\
-                .select("*")\
-                .order('original_row_number', desc=False)\
-                .range(offset, offset + batch_size - 1)\
-                .execute()
-                
-            if not response.data:
-                break
-                
-            # Data is already in separate columns, extend directly
-            all_data.extend(response.data)
-                
-            if len(response.data) < batch_size:
-                break
-                
-            offset += batch_size
+        table_name = sheet_table_name(project_name, identifier, 'original')
+        
+        return list(chain.from_iterable(self._fetch_pages(table_name)))
     
-        return all_data
+    def iter_original_data(self, table_name: str, sheet_identifier: str,
+                           batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over ALL original data, fetching one page at a time
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            batch_size: Number of rows to fetch per page
+        
+        Yields:
+            Row dictionaries in original_row_number order
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'original')
+        for page in self._fetch_pages(safe_table_name, batch_size):
+            yield from page
     
     # =========================
     # BATCH INSERT HELPER
     # =========================
     
-    def _insert_batch(self, table_name: str, batch: List[Dict[str, Any]], batch_num: int, max_retries: int = 3) -> tuple[int, int, int]:
+    def _insert_attempt(self, table_name: str, batch: List[Dict[str, Any]], batch_num: int, attempt: int,
+                        max_retries: int = 3, returning: str = 'minimal',
+                        ignore_duplicates: bool = True) -> tuple[int, int, int]:
         """
-        Insert a single batch with retry logic
+        Make one insert attempt for a batch without sleeping
+        
+        A failure that still has attempts left raises _RetryBatch carrying the backoff, so
+        the caller decides where to wait instead of a worker thread idling through it.
+        The last attempt falls back to row-by-row inserts.
         
         Args:
             table_name: Table to insert into
             batch: Data batch to insert
             batch_num: Batch number for logging
+            attempt: Zero-based attempt number
             max_retries: Maximum retry attempts
+            returning: PostgREST return preference ('minimal' skips echoing the rows back)
+            ignore_duplicates: Skip rows whose primary key already exists, so a retry does not
+                fail on rows an earlier attempt committed. This only holds where row_id is the
+                primary key (original and included tables); the excluded table's key is a
+                BIGSERIAL id, so a retried batch that had already landed is inserted twice
             
         Returns:
             Tuple of (batch_num, rows_inserted, rows_failed)
         """
+        # Present rows in primary key order so the btree on row_id sees
+        # near-sequential inserts instead of random page splits
+        if attempt == 0 and batch and 'row_id' in batch[0]:
+            batch.sort(key=_row_id_key)
+        
+        try:
+            if self.direct_db and attempt == 0 and len(batch) >= COPY_MIN_ROWS:
+                self._copy_batch(table_name, batch)
+            elif self.direct_db:
+                # Retries use INSERT so ON CONFLICT can absorb rows an earlier attempt committed
+                self._insert_values(table_name, batch, ignore_duplicates)
+            else:
+                with self._db_slots:
+                    self._post_rows(table_name, batch, returning, ignore_duplicates)
+            return (batch_num, len(batch), 0)
+            
+        except Exception as e:
+            if attempt < max_retries - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"Batch {batch_num} failed (attempt {attempt + 1}/{max_retries}), retrying in {wait_time}s: {e}")
+                raise _RetryBatch(wait_time) from e
+        
+        logger.warning(f"Batch {batch_num} failed after {max_retries} attempts, trying row-by-row")
         rows_inserted = 0
         rows_failed = 0
+        if self.direct_db:
+            rows_inserted, rows_failed = self._insert_rows_individually(table_name, batch, batch_num)
+        else:
+            with self._db_slots:
+                for row in batch:
+                    try:
+                        self._post_rows(table_name, [row], returning, ignore_duplicates)
+                        rows_inserted += 1
+                    except Exception as row_error:
+                        logger.error(f"Row in batch {batch_num} failed: {row_error}")
+                        rows_failed += 1
         
-        for retry in range(max_retries):
-            try:
-                client = create_client(self.url, self.key)
-                client.table(table_name).insert(batch).execute()
-                rows_inserted = len(batch)
-                return (batch_num, rows_inserted, rows_failed)
-                
-            except Exception as e:
-                if retry < max_retries - 1:
-                    wait_time = (retry + 1) * 2
-                    logger.warning(f"Batch {batch_num} failed (attempt {retry + 1}/{max_retries}), retrying in {wait_time}s: {e}")
-                    time.sleep(wait_time)
-                else:
-                    logger.warning(f"Batch {batch_num} failed after {max_retries} attempts, trying row-by-row")
-                    client = create_client(self.url, self.key)
-                    for row in batch:
+        return (batch_num, rows_inserted, rows_failed)
+    
+    def _insert_values(self, table_name: str, batch: List[Dict[str, Any]], ignore_duplicates: bool = False) -> None:
+        """
+        Insert a batch as one multi-row INSERT ... VALUES statement over a pooled connection
+        
+        Args:
+            table_name: Table to insert into
+            batch: Rows to insert
+            ignore_duplicates: Skip rows whose primary key already exists
+        """
+        columns = list(batch[0].keys())
+        statement = sql.SQL("INSERT INTO {table} ({columns}) VALUES %s").format(
+            table=sql.Identifier(table_name),
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns))
+        )
+        if ignore_duplicates:
+            statement += sql.SQL(" ON CONFLICT DO NOTHING")
+        
+        with self._db_connection() as connection:
+            with connection.cursor() as cursor:
+                # Bulk load: don't wait for the WAL flush on commit
+                cursor.execute("SET LOCAL synchronous_commit = OFF")
+                psycopg2.extras.execute_values(
+                    cursor,
+                    statement,
+                    _row_tuples(batch, columns),
+                    page_size=len(batch)
+                )
+    
+    def _copy_batch(self, table_name: str, batch: List[Dict[str, Any]]) -> None:
+        """
+        Load a batch with COPY ... FROM STDIN over a pooled connection
+        
+        COPY skips per-statement parse/plan entirely, so it beats multi-row
+        INSERT for large batches. Parallelism still comes from the worker
+        pool, with one COPY stream per pooled connection.
+        
+        Args:
+            table_name: Table to load into
+            batch: Rows to load
+        """
+        with self._db_connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL synchronous_commit = OFF")
+                self._copy_rows(cursor, table_name, batch)
+    
+    @staticmethod
+    def _copy_rows(cursor, table_name: str, rows: List[Dict[str, Any]]) -> None:
+        """
+        Stream rows into a table with COPY on an open cursor (no commit)
+        
+        Args:
+            cursor: Cursor of the connection/transaction to load in
+            table_name: Table to load into
+            rows: Rows to load
+        """
+        columns = list(rows[0].keys())
+        buffer = io.StringIO()
+        for values in _row_tuples(rows, columns):
+            buffer.write('\t'.join(map(_copy_text_value, values)))
+            buffer.write('\n')
+        buffer.seek(0)
+        
+        statement = sql.SQL("COPY {table} ({columns}) FROM STDIN").format(
+            table=sql.Identifier(table_name),
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns))
+        )
+        cursor.copy_expert(statement.as_string(cursor), buffer)
+    
+    def _insert_rows_individually(self, table_name: str, batch: List[Dict[str, Any]], batch_num: int) -> tuple[int, int]:
+        """
+        Insert a failed batch one row at a time over a pooled PostgreSQL connection
+        
+        The INSERT is prepared once and each row runs it under its own savepoint,
+        so the statement is parsed and planned a single time, a bad row is rolled
+        back on its own, and the good rows are committed together in one transaction.
+        
+        Args:
+            table_name: Table to insert into
+            batch: Rows of the batch that failed as a whole
+            batch_num: Batch number for logging
+        
+        Returns:
+            Tuple of (rows_inserted, rows_failed)
+        """
+        rows_inserted = 0
+        rows_failed = 0
+        
+        columns = list(batch[0].keys())
+        prepare = sql.SQL("PREPARE row_insert_stmt AS INSERT INTO {table} ({columns}) VALUES ({params})").format(
+            table=sql.Identifier(table_name),
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            params=sql.SQL(', ').join(sql.SQL(f"${position}") for position in range(1, len(columns) + 1))
+        )
+        statement = sql.SQL(
+            "SAVEPOINT row_insert; "
+            "EXECUTE row_insert_stmt ({values}); "
+            "RELEASE SAVEPOINT row_insert"
+        ).format(values=sql.SQL(', ').join(sql.Placeholder() * len(columns)))
+        
+        try:
+            with self._db_connection() as connection:
+                with connection.cursor() as cursor:
+                    # Prepared statements outlive the transaction, so clear one left by an aborted call
+                    cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = 'row_insert_stmt'")
+                    if cursor.fetchone():
+                        cursor.execute("DEALLOCATE row_insert_stmt")
+                    cursor.execute(prepare)
+                    
+                    for values in _row_tuples(batch, columns):
                         try:
-                            client.table(table_name).insert([row]).execute()
+                            cursor.execute(statement, values)
                             rows_inserted += 1
-                        except Exception as row_error:
+                        except psycopg2.Error as row_error:
+                            cursor.execute("ROLLBACK TO SAVEPOINT row_insert")
                             logger.error(f"Row in batch {batch_num} failed: {row_error}")
                             rows_failed += 1
                     
-                    return (batch_num, rows_inserted, rows_failed)
+                    cursor.execute("DEALLOCATE row_insert_stmt")
+        except Exception as e:
+            logger.error(f"Row-by-row insert for batch {batch_num} failed: {e}")
+            return (0, len(batch))
         
-        return (batch_num, rows_inserted, rows_failed)
+        return (rows_inserted, rows_failed)
+    
+    def _bulk_load(self, table_name: str, data: List[Dict[str, Any]]) -> bool:
+        """
+        Load rows with a single asyncpg binary COPY
+        
+        Args:
+            table_name: Table to load into
+            data: Rows to load
+        
+        Returns:
+            bool: True if the rows were loaded, False if the caller should use the default path
+        """
+        if asyncpg is None or not self.direct_db:
+            logger.warning("asyncpg engine unavailable, using the default insert path")
+            return False
+        
+        columns = list(data[0].keys())
+        if 'row_id' in columns:
+            # Same primary key order as the batched paths; sorts references, not the rows
+            data = sorted(data, key=_row_id_key)
+        
+        start_time = time.time()
+        try:
+            with self._db_slots:
+                copied = asyncio.run(self._bulk_copy(table_name, data, columns))
+        except Exception as e:
+            # The COPY runs in one transaction, so nothing landed and the default path can start clean
+            logger.warning(f"asyncpg COPY into {table_name} failed, using the default insert path: {e}")
+            return False
+        
+        elapsed = time.time() - start_time
+        logger.info(f"✓ Copied {copied:,} rows into {table_name} in {elapsed:.1f}s")
+        return True
+    
+    @staticmethod
+    async def _bulk_copy(table_name: str, rows: Iterable[Dict[str, Any]], columns: List[str]) -> int:
+        """
+        Stream rows into a table with asyncpg's binary COPY in one transaction
+        
+        A fresh connection is opened per call because asyncpg connections are bound to
+        the event loop that created them, and each asyncio.run starts a new loop.
+        
+        Args:
+            table_name: Table to load into
+            rows: Rows to load
+            columns: Columns to copy, in record order
+        
+        Returns:
+            Number of rows copied
+        """
+        conn = await asyncpg.connect(
+            user=DB_CONFIG['user'],
+            password=DB_CONFIG['password'],
+            host=DB_CONFIG['host'],
+            port=int(DB_CONFIG['port']),
+            database=DB_CONFIG['dbname'],
+            ssl=DB_CONFIG['sslmode'],
+            server_settings={'application_name': DB_CONFIG['application_name']},
+            # asyncpg's statement cache relies on session-level prepared statements
+            statement_cache_size=0 if TRANSACTION_POOLER else 100
+        )
+        try:
+            async with conn.transaction():
+                await conn.execute("SET LOCAL synchronous_commit = OFF")
+                status = await conn.copy_records_to_table(
+                    table_name,
+                    # Tuples are built as the COPY stream consumes them, not as a second copy of the data
+                    records=_iter_row_tuples(rows, columns),
+                    columns=columns
+                )
+        finally:
+            await conn.close()
+        
+        return int(status.split()[-1])
+    
+    def _effective_batch_size(self, sample_row: Dict[str, Any], batch_size: int) -> int:
+        """
+        Shrink batch_size so a REST insert body stays under MAX_REST_PAYLOAD_BYTES
+        
+        Oversized bodies are rejected by PostgREST and end up in the slow
+        row-by-row fallback. The direct database path has no body limit, so
+        the requested size is kept there.
+        
+        Args:
+            sample_row: A representative row (the first one)
+            batch_size: Requested rows per batch
+        
+        Returns:
+            int: Rows per batch to use (the size cap is never pushed below 100)
+        """
+        if self.direct_db:
+            return batch_size
+        
+        approx_row_bytes = len(_json_dumps(sample_row)) + 1
+        effective = min(batch_size, max(100, MAX_REST_PAYLOAD_BYTES // approx_row_bytes))
+        if effective != batch_size:
+            logger.info(f"Adjusted batch_size {batch_size} -> {effective} (~{approx_row_bytes} bytes/row)")
+        return effective
+    
+    def _bulk_upload(self, table_name: str, data: Iterable[Dict[str, Any]], batch_size: int, max_workers: int,
+                     kind: str, clear: bool = False, truncate: bool = True, engine: str = 'default') -> bool:
+        """
+        Shared body of the append_* and insert_* methods
+        
+        Args:
+            table_name: Physical table to load into
+            data: Iterable of row dictionaries (list or generator)
+            batch_size: Number of rows per batch
+            max_workers: Number of parallel workers
+            kind: Table type ('original', 'included' or 'excluded'), used in log messages
+            clear: Empty the table before loading
+            truncate: Clear with TRUNCATE instead of a row-by-row DELETE
+            engine: 'asyncpg' loads a list with one binary COPY, falling back to the default path if unavailable
+        
+        Returns:
+            bool: True if successful
+        """
+        try:
+            if clear:
+                self._clear_table(table_name, truncate)
+            
+            total_rows = len(data) if isinstance(data, Sized) else None
+            if total_rows == 0:
+                logger.warning("No data to insert")
+                return True
+            
+            if engine == 'asyncpg' and isinstance(data, list) and self._bulk_load(table_name, data):
+                return True
+            
+            rows_label = f"{total_rows:,}" if total_rows is not None else "streamed"
+            logger.info(
+                f"Uploading {rows_label} {kind} rows to {table_name} "
+                f"(batch_size={batch_size}, workers={max_workers})..."
+            )
+            
+            start_time = time.time()
+            total_inserted, total_failed = self._upload_batches(
+                table_name, data, batch_size, max_workers, total_rows=total_rows
+            )
+            
+            total_processed = total_inserted + total_failed
+            if total_processed == 0:
+                logger.warning("No data to insert")
+                return True
+            
+            elapsed = time.time() - start_time
+            success_rate = (total_inserted / total_processed) * 100
+            avg_rate = total_inserted / elapsed if elapsed > 0 else 0
+            
+            logger.info(
+                f"✓ Upload complete: {total_inserted:,}/{total_processed:,} rows ({success_rate:.2f}%) | "
+                f"Time: {elapsed:.1f}s | "
+                f"Avg rate: {avg_rate:.0f} rows/sec"
+            )
+            
+            return True
+        
+        except Exception as e:
+            logger.error(f"Error uploading {kind} data: {str(e)}")
+            raise
+    
+    def _upload_batches(self, table_name: str, rows: Iterable[Dict[str, Any]], batch_size: int,
+                        max_workers: int, total_rows: Optional[int] = None) -> tuple[int, int]:
+        """
+        Insert rows in parallel batches, pulling batches from the input only as workers free up
+        
+        Args:
+            table_name: Table to insert into
+            rows: Iterable of rows (list or generator)
+            batch_size: Number of rows per batch
+            max_workers: Number of parallel workers
+            total_rows: Row count if known up front, used for progress reporting
+        
+        Returns:
+            Tuple of (rows_inserted, rows_failed)
+        """
+        rows = iter(rows)
+        first_row = next(rows, None)
+        if first_row is None:
+            return (0, 0)
+        rows = chain([first_row], rows)
+        batch_size = self._effective_batch_size(first_row, batch_size)
+        
+        total_batches = (total_rows + batch_size - 1) // batch_size if total_rows is not None else None
+        max_in_flight = max_workers * 2
+        
+        total_inserted = 0
+        total_failed = 0
+        completed_batches = 0
+        start_time = time.time()
+        
+        def collect(futures):
+            nonlocal total_inserted, total_failed, completed_batches
+            for future in futures:
+                batch_num, rows_inserted, rows_failed = future.result()
+                total_inserted += rows_inserted
+                total_failed += rows_failed
+                completed_batches += 1
+                
+                if completed_batches % 10 == 0 or completed_batches == total_batches:
+                    elapsed = time.time() - start_time
+                    rate = total_inserted / elapsed if elapsed > 0 else 0
+                    if total_batches:
+                        progress_pct = (completed_batches / total_batches) * 100
+                        logger.info(
+                            f"Progress: {completed_batches}/{total_batches} batches ({progress_pct:.1f}%) | "
+                            f"{total_inserted:,}/{total_rows:,} rows | "
+                            f"Rate: {rate:.0f} rows/sec"
+                        )
+                    else:
+                        logger.info(
+                            f"Progress: {completed_batches} batches | "
+                            f"{total_inserted:,} rows | "
+                            f"Rate: {rate:.0f} rows/sec"
+                        )
+        
+        batches = enumerate(_iter_batches(rows, batch_size))
+        exhausted = False
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            # Failed batches wait here for their backoff to expire instead of sleeping
+            # inside a worker, so the other workers keep the pool busy meanwhile
+            retry_queue = []
+            
+            def submit(batch_num, batch, attempt):
+                future = executor.submit(self._insert_attempt, table_name, batch, batch_num, attempt)
+                in_flight[future] = (batch_num, batch, attempt)
+            
+            while True:
+                now = time.time()
+                while retry_queue and retry_queue[0][0] <= now and len(in_flight) < max_in_flight:
+                    _, batch_num, batch, attempt = heapq.heappop(retry_queue)
+                    submit(batch_num, batch, attempt)
+                
+                while not exhausted and len(in_flight) < max_in_flight:
+                    next_batch = next(batches, None)
+                    if next_batch is None:
+                        exhausted = True
+                    else:
+                        submit(*next_batch, 0)
+                
+                if not in_flight and not retry_queue:
+                    break
+                
+                timeout = max(0.0, retry_queue[0][0] - time.time()) if retry_queue else None
+                if not in_flight:
+                    time.sleep(timeout)
+                    continue
+                
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                finished = []
+                for future in done:
+                    batch_num, batch, attempt = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except _RetryBatch as retry:
+                        heapq.heappush(retry_queue, (time.time() + retry.delay, batch_num, batch, attempt + 1))
+                        continue
+                    finished.append(future)
+                collect(finished)
+        
+        return (total_inserted, total_failed)
+    
+    def _post_rows(self, table_name: str, rows: List[Dict[str, Any]], returning: str = 'minimal',
+                   ignore_duplicates: bool = False) -> None:
+        """
+        POST rows to the PostgREST endpoint of a table over the shared HTTP client
+        
+        Args:
+            table_name: Table to insert into
+            rows: Rows to insert
+            returning: 'minimal' (no response body) or 'representation'
+            ignore_duplicates: Skip rows whose primary key already exists (like ON CONFLICT DO NOTHING)
+        """
+        prefer = [f"return={returning}"]
+        if ignore_duplicates:
+            prefer.append('resolution=ignore-duplicates')
+        
+        response = self._http.post(
+            f"/{table_name}",
+            content=_json_dumps(rows),
+            headers={'Content-Type': 'application/json', 'Prefer': ','.join(prefer)}
+        )
+        if response.is_error:
+            # Surface the PostgREST error body (constraint name, code) in the logs
+            raise httpx.HTTPStatusError(
+                f"{response.status_code} inserting into {table_name}: {response.text}",
+                request=response.request,
+                response=response
+            )
     
     # =========================
     # CLEANED DATA TABLES
@@ -297,10 +1227,8 @@ class SupabaseManager:
         Returns:
             bool: True if successful
         """
-        safe_table_name = table_name.lower().replace(' ', '_').replace('-', '_')
-        
-        included_table = f"{safe_table_name}_{sheet_identifier}_included"
-        excluded_table = f"{safe_table_name}_{sheet_identifier}_excluded"
+        included_table = sheet_table_name(table_name, sheet_identifier, 'included')
+        excluded_table = sheet_table_name(table_name, sheet_identifier, 'excluded')
         
         try:
             # Create included data table
@@ -337,17 +1265,12 @@ class SupabaseManager:
             ON {excluded_table}(original_row_number);
             """
             
-            self.client.rpc('execute_sql', {'query': included_sql}).execute()
-            logger.info(f"Created/verified table: {included_table}")
+            # Both tables, the read helpers and the PostgREST schema reload go out in a single round trip
+            reload_sql = "NOTIFY pgrst, 'reload schema';"
+            self.client.rpc('execute_sql', {'query': included_sql + excluded_sql + RPC_FUNCTIONS_SQL + reload_sql}).execute()
+            logger.info(f"Created/verified tables: {included_table}, {excluded_table}")
             
-            self.client.rpc('execute_sql', {'query': excluded_sql}).execute()
-            logger.info(f"Created/verified table: {excluded_table}")
-            
-            # Refresh schema
-            self.client.rpc('refresh_schema').execute()
-            
-            # Wait for PostgREST to update its schema cache
-            time.sleep(2)
+            self._wait_for_schema(included_table, excluded_table)
             logger.info(f"Schema cache refreshed for cleaned data tables")
             
             return True
@@ -357,7 +1280,7 @@ class SupabaseManager:
             raise
     
     def append_included_data(self, table_name: str, sheet_identifier: str, data: List[Dict[str, Any]], 
-                            batch_size: int = 5000, max_workers: int = 5) -> bool:
+                            batch_size: int = 5000, max_workers: int = 5, engine: str = 'default') -> bool:
         """
         Append included data to Supabase (does not clear existing data)
         
@@ -367,57 +1290,16 @@ class SupabaseManager:
             data: List of dictionaries containing the cleaned data
             batch_size: Number of rows per batch
             max_workers: Number of parallel workers
+            engine: 'asyncpg' loads the rows with one binary COPY, falling back to the default path if unavailable
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_included"
-        
-        try:
-            if not data:
-                logger.warning("No data to insert")
-                return True
-            
-            total_rows = len(data)
-            logger.info(f"Appending {total_rows:,} rows to {safe_table_name}...")
-            
-            # Create batches
-            batches = []
-            for i in range(0, total_rows, batch_size):
-                batch = data[i:i + batch_size]
-                batches.append((i // batch_size, batch))
-            
-            total_batches = len(batches)
-            
-            # Process batches in parallel
-            total_inserted = 0
-            total_failed = 0
-            completed_batches = 0
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {
-                    executor.submit(self._insert_batch, safe_table_name, batch, batch_num): batch_num
-                    for batch_num, batch in batches
-                }
-                
-                for future in as_completed(future_to_batch):
-                    batch_num, rows_inserted, rows_failed = future.result()
-                    total_inserted += rows_inserted
-                    total_failed += rows_failed
-                    completed_batches += 1
-            
-            elapsed = time.time() - start_time
-            logger.info(f"✓ Appended {total_inserted:,} rows in {elapsed:.1f}s")
-            
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error appending included data: {str(e)}")
-            raise
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
+        return self._bulk_upload(safe_table_name, data, batch_size, max_workers, 'included', engine=engine)
     
     def append_excluded_data(self, table_name: str, sheet_identifier: str, data: List[Dict[str, Any]],
-                            batch_size: int = 5000, max_workers: int = 5) -> bool:
+                            batch_size: int = 5000, max_workers: int = 5, engine: str = 'default') -> bool:
         """
         Append excluded data to Supabase (does not clear existing data)
         
@@ -427,221 +1309,132 @@ class SupabaseManager:
             data: List of dictionaries containing the excluded data
             batch_size: Number of rows per batch
             max_workers: Number of parallel workers
+            engine: 'asyncpg' loads the rows with one binary COPY, falling back to the default path if unavailable
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_excluded"
-        
-        try:
-            if not data:
-                logger.warning("No data to insert")
-                return True
-            
-            total_rows = len(data)
-            logger.info(f"Appending {total_rows:,} rows to {safe_table_name}...")
-            
-            # Create batches
-            batches = []
-            for i in range(0, total_rows, batch_size):
-                batch = data[i:i + batch_size]
-                batches.append((i // batch_size, batch))
-            
-            total_batches = len(batches)
-            
-            # Process batches in parallel
-            total_inserted = 0
-            total_failed = 0
-            completed_batches = 0
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {
-                    executor.submit(self._insert_batch, safe_table_name, batch, batch_num): batch_num
-                    for batch_num, batch in batches
-                }
-                
-                for future in as_completed(future_to_batch):
-                    batch_num, rows_inserted, rows_failed = future.result()
-                    total_inserted += rows_inserted
-                    total_failed += rows_failed
-                    completed_batches += 1
-            
-            elapsed = time.time() - start_time
-            logger.info(f"✓ Appended {total_inserted:,} rows in {elapsed:.1f}s")
-            
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error appending excluded data: {str(e)}")
-            raise
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        return self._bulk_upload(safe_table_name, data, batch_size, max_workers, 'excluded', engine=engine)
     
-    def insert_included_data(self, table_name: str, sheet_identifier: str, data: List[Dict[str, Any]], 
-                            batch_size: int = 10000, max_workers: int = 5) -> bool:
+    def insert_included_data(self, table_name: str, sheet_identifier: str, data: Iterable[Dict[str, Any]],
+                            batch_size: int = 10000, max_workers: int = 5, truncate: bool = True,
+                            engine: str = 'default') -> bool:
         """
         Insert cleaned/included data into Supabase with parallel batch processing (clears existing)
         
+        Rows are consumed lazily, so ``data`` may be a generator straight from the
+        cleaner; at most ``max_workers * 2`` batches are held in memory at once.
+        
         Args:
             table_name: Base table name
             sheet_identifier: Sheet identifier
-            data: List of dictionaries containing the cleaned data
+            data: Iterable of dictionaries containing the cleaned data
             batch_size: Number of rows per batch (default: 10000)
             max_workers: Number of parallel workers (default: 5)
+            truncate: Clear with TRUNCATE (default) instead of a row-by-row DELETE
+            engine: 'asyncpg' loads a list with one binary COPY, falling back to the default path if unavailable
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_included"
-        
-        try:
-            # Clear existing data for this batch
-            logger.info(f"Clearing existing data from {safe_table_name}...")
-            self.client.table(safe_table_name).delete().neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
-            
-            if not data:
-                logger.warning("No data to insert")
-                return True
-            
-            total_rows = len(data)
-            logger.info(f"Starting parallel batch insert of {total_rows:,} rows (batch_size={batch_size}, workers={max_workers})...")
-            
-            # Create batches
-            batches = []
-            for i in range(0, total_rows, batch_size):
-                batch = data[i:i + batch_size]
-                batches.append((i // batch_size, batch))
-            
-            total_batches = len(batches)
-            logger.info(f"Created {total_batches} batches")
-            
-            # Process batches in parallel
-            total_inserted = 0
-            total_failed = 0
-            completed_batches = 0
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {
-                    executor.submit(self._insert_batch, safe_table_name, batch, batch_num): batch_num
-                    for batch_num, batch in batches
-                }
-                
-                for future in as_completed(future_to_batch):
-                    batch_num, rows_inserted, rows_failed = future.result()
-                    total_inserted += rows_inserted
-                    total_failed += rows_failed
-                    completed_batches += 1
-                    
-                    if completed_batches % 10 == 0 or completed_batches == total_batches:
-                        elapsed = time.time() - start_time
-                        progress_pct = (completed_batches / total_batches) * 100
-                        rate = total_inserted / elapsed if elapsed > 0 else 0
-                        logger.info(
-                            f"Progress: {completed_batches}/{total_batches} batches ({progress_pct:.1f}%) | "
-                            f"{total_inserted:,}/{total_rows:,} rows | "
-                            f"Rate: {rate:.0f} rows/sec"
-                        )
-            
-            elapsed = time.time() - start_time
-            success_rate = (total_inserted / total_rows) * 100 if total_rows > 0 else 0
-            avg_rate = total_inserted / elapsed if elapsed > 0 else 0
-            
-            logger.info(
-                f"✓ Insert complete: {total_inserted:,}/{total_rows:,} rows ({success_rate:.2f}%) | "
-                f"Time: {elapsed:.1f}s | "
-                f"Avg rate: {avg_rate:.0f} rows/sec"
-            )
-            
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error inserting included data: {str(e)}")
-            raise
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
+        return self._bulk_upload(safe_table_name, data, batch_size, max_workers, 'included',
+                                 clear=True, truncate=truncate, engine=engine)
     
-    def insert_excluded_data(self, table_name: str, sheet_identifier: str, data: List[Dict[str, Any]],
-                            batch_size: int = 10000, max_workers: int = 5) -> bool:
+    def insert_excluded_data(self, table_name: str, sheet_identifier: str, data: Iterable[Dict[str, Any]],
+                            batch_size: int = 10000, max_workers: int = 5, truncate: bool = True,
+                            engine: str = 'default') -> bool:
         """
         Insert excluded data into Supabase with parallel batch processing (clears existing)
         
+        Rows are consumed lazily, so ``data`` may be a generator straight from the
+        cleaner; at most ``max_workers * 2`` batches are held in memory at once.
+        
         Args:
             table_name: Base table name
             sheet_identifier: Sheet identifier
-            data: List of dictionaries containing the excluded data
+            data: Iterable of dictionaries containing the excluded data
             batch_size: Number of rows per batch (default: 10000)
             max_workers: Number of parallel workers (default: 5)
+            truncate: Clear with TRUNCATE (default) instead of a row-by-row DELETE
+            engine: 'asyncpg' loads a list with one binary COPY, falling back to the default path if unavailable
         
         Returns:
             bool: True if successful
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_excluded"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        return self._bulk_upload(safe_table_name, data, batch_size, max_workers, 'excluded',
+                                 clear=True, truncate=truncate, engine=engine)
+    
+    def replace_sheet(self, table_name: str, sheet_identifier: str,
+                      included: Iterable[Dict[str, Any]], excluded: Iterable[Dict[str, Any]],
+                      batch_size: int = 10000, max_workers: int = 5) -> bool:
+        """
+        Replace a sheet's included and excluded rows in a single transaction
         
-        try:
-            # Clear existing data for this batch
-            logger.info(f"Clearing existing data from {safe_table_name}...")
-            self.client.table(safe_table_name).delete().neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
-            
-            if not data:
-                logger.warning("No data to insert")
-                return True
-            
-            total_rows = len(data)
-            logger.info(f"Starting parallel batch insert of {total_rows:,} rows (batch_size={batch_size}, workers={max_workers})...")
-            
-            # Create batches
-            batches = []
-            for i in range(0, total_rows, batch_size):
-                batch = data[i:i + batch_size]
-                batches.append((i // batch_size, batch))
-            
-            total_batches = len(batches)
-            logger.info(f"Created {total_batches} batches")
-            
-            # Process batches in parallel
-            total_inserted = 0
-            total_failed = 0
-            completed_batches = 0
-            start_time = time.time()
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {
-                    executor.submit(self._insert_batch, safe_table_name, batch, batch_num): batch_num
-                    for batch_num, batch in batches
-                }
+        Truncates both tables and COPYs both datasets on one pooled connection,
+        so the sheet is swapped with one commit and readers never see it half
+        loaded. Falls back to insert_included_data + insert_excluded_data when
+        there is no direct database access, or when the transaction fails and
+        both inputs can be iterated again (lists rather than generators).
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            included: Cleaned rows for the included table
+            excluded: Rows for the excluded table
+            batch_size: Rows per COPY chunk (and per batch in the fallback)
+            max_workers: Number of parallel workers for the fallback
+        
+        Returns:
+            bool: True if successful
+        """
+        included_table = sheet_table_name(table_name, sheet_identifier, 'included')
+        excluded_table = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        
+        if self.direct_db:
+            try:
+                start_time = time.time()
+                counts = {}
                 
-                for future in as_completed(future_to_batch):
-                    batch_num, rows_inserted, rows_failed = future.result()
-                    total_inserted += rows_inserted
-                    total_failed += rows_failed
-                    completed_batches += 1
-                    
-                    if completed_batches % 10 == 0 or completed_batches == total_batches:
-                        elapsed = time.time() - start_time
-                        progress_pct = (completed_batches / total_batches) * 100
-                        rate = total_inserted / elapsed if elapsed > 0 else 0
-                        logger.info(
-                            f"Progress: {completed_batches}/{total_batches} batches ({progress_pct:.1f}%) | "
-                            f"{total_inserted:,}/{total_rows:,} rows | "
-                            f"Rate: {rate:.0f} rows/sec"
+                with self._db_connection() as connection:
+                    with connection.cursor() as cursor:
+                        cursor.execute("SET LOCAL synchronous_commit = OFF")
+                        cursor.execute(
+                            sql.SQL("TRUNCATE TABLE {}, {} RESTART IDENTITY").format(
+                                sql.Identifier(included_table), sql.Identifier(excluded_table)
+                            )
                         )
-            
-            elapsed = time.time() - start_time
-            success_rate = (total_inserted / total_rows) * 100 if total_rows > 0 else 0
-            avg_rate = total_inserted / elapsed if elapsed > 0 else 0
-            
-            logger.info(
-                f"✓ Insert complete: {total_inserted:,}/{total_rows:,} rows ({success_rate:.2f}%) | "
-                f"Time: {elapsed:.1f}s | "
-                f"Avg rate: {avg_rate:.0f} rows/sec"
-            )
-            
-            return True
-        
-        except Exception as e:
-            logger.error(f"Error inserting excluded data: {str(e)}")
-            raise
+                        for target, rows in ((included_table, included), (excluded_table, excluded)):
+                            counts[target] = 0
+                            for batch in _iter_batches(rows, batch_size):
+                                if 'row_id' in batch[0]:
+                                    batch.sort(key=_row_id_key)
+                                self._copy_rows(cursor, target, batch)
+                                counts[target] += len(batch)
+                
+                elapsed = time.time() - start_time
+                logger.info(
+                    f"✓ Replaced sheet {sheet_identifier}: {counts[included_table]:,} included, "
+                    f"{counts[excluded_table]:,} excluded rows in one transaction ({elapsed:.1f}s)"
+                )
+                return True
+            
+            except Exception as e:
+                if not (isinstance(included, Sized) and isinstance(excluded, Sized)):
+                    logger.error(f"Error replacing sheet {sheet_identifier}: {str(e)}")
+                    raise
+                logger.warning(f"Single-transaction replace failed, falling back to separate inserts: {e}")
+        
+        self.insert_included_data(table_name, sheet_identifier, included, batch_size, max_workers)
+        self.insert_excluded_data(table_name, sheet_identifier, excluded, batch_size, max_workers)
+        return True
     
     def get_included_data(self, table_name: str, sheet_identifier: str, 
-                          limit: Optional[int] = None, offset: Optional[int] = 0) -> List[Dict[str, Any]]:
+                          limit: Optional[int] = None, offset: Optional[int] = 0,
+                          after_row_number: Optional[int] = None,
+                          columns: Optional[Iterable[str]] = INCLUDED_COLUMNS) -> List[Dict[str, Any]]:
         """
         Retrieve included data from Supabase with pagination
         
@@ -649,17 +1442,24 @@ class SupabaseManager:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             limit: Maximum number of rows to retrieve
-            offset: Number of rows to skip
+            offset: Number of rows to skip (ignored when after_row_number is given)
+            after_row_number: Keyset cursor - return rows after this original_row_number
+            columns: Columns to return, or None for every column
         
         Returns:
             List of dictionaries containing the data
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_included"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
         
         try:
-            query = self.client.table(safe_table_name).select("*").order('original_row_number')
-            
-            if offset:
+            select = ','.join(columns) if columns else '*'
+            query = self.client.table(safe_table_name).select(select).order('original_row_number')
+            
+            if after_row_number is not None:
+                query = query.gt('original_row_number', after_row_number)
+                if limit:
+                    query = query.limit(limit)
+            elif offset:
                 query = query.range(offset, offset + limit - 1 if limit else 999999)
             elif limit:
                 query = query.limit(limit)
@@ -672,7 +1472,9 @@ class SupabaseManager:
             return []
     
     def get_excluded_data(self, table_name: str, sheet_identifier: str,
-                          limit: Optional[int] = None, offset: Optional[int] = 0) -> List[Dict[str, Any]]:
+                          limit: Optional[int] = None, offset: Optional[int] = 0,
+                          after_row_number: Optional[int] = None,
+                          columns: Optional[Iterable[str]] = EXCLUDED_COLUMNS) -> List[Dict[str, Any]]:
         """
         Retrieve excluded data from Supabase with pagination
         
@@ -680,17 +1482,24 @@ class SupabaseManager:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             limit: Maximum number of rows to retrieve
-            offset: Number of rows to skip
+            offset: Number of rows to skip (ignored when after_row_number is given)
+            after_row_number: Keyset cursor - return rows after this original_row_number
+            columns: Columns to return, or None for every column
         
         Returns:
             List of dictionaries containing the data
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_excluded"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
         
         try:
-            query = self.client.table(safe_table_name).select("*").order('original_row_number')
-            
-            if offset:
+            select = ','.join(columns) if columns else '*'
+            query = self.client.table(safe_table_name).select(select).order('original_row_number')
+            
+            if after_row_number is not None:
+                query = query.gt('original_row_number', after_row_number)
+                if limit:
+                    query = query.limit(limit)
+            elif offset:
                 query = query.range(offset, offset + limit - 1 if limit else 999999)
             elif limit:
                 query = query.limit(limit)
@@ -702,6 +1511,79 @@ class SupabaseManager:
             logger.error(f"Error retrieving excluded data: {str(e)}")
             return []
     
+    def _fetch_pages(self, table_name: str, batch_size: int = 1000,
+                     after_row_number: int = -1) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield a table page by page in original_row_number order
+        
+        Pages come from the get_all_rows RPC in chunks of RPC_PAGE_SIZE rows,
+        one request per chunk instead of one per PostgREST page. If the RPC is
+        not installed, falls back to REST pages of batch_size rows. Both use
+        keyset pagination: each request is an index range scan after the last
+        row seen instead of an OFFSET re-scan.
+        
+        Args:
+            table_name: Physical table name
+            batch_size: Number of rows per REST page
+            after_row_number: Start after this original_row_number
+        
+        Yields:
+            Lists of row dictionaries
+        """
+        last_row_number = after_row_number
+        
+        while True:
+            if self.use_rpc_fetch:
+                try:
+                    page = self._rpc_page(table_name, last_row_number)
+                except Exception as e:
+                    # Only a missing function switches the manager to REST pages for good;
+                    # timeouts and server errors must not outlive the call that hit them
+                    if not _is_missing_function(e):
+                        raise
+                    logger.warning(f"get_all_rows RPC unavailable, using REST pagination: {e}")
+                    self.use_rpc_fetch = False
+                    continue
+                page_size = RPC_PAGE_SIZE
+            else:
+                response = self.client.table(table_name)\
+                    .select("*")\
+                    .gt('original_row_number', last_row_number)\
+                    .order('original_row_number')\
+                    .limit(batch_size)\
+                    .execute()
+                page = response.data
+                page_size = batch_size
+            
+            if not page:
+                return
+            
+            yield page
+            
+            if len(page) < page_size:
+                return
+            
+            last_row_number = page[-1]['original_row_number']
+    
+    @_retry_with_backoff()
+    def _rpc_page(self, table_name: str, after_row_number: int) -> List[Dict[str, Any]]:
+        """
+        One get_all_rows RPC chunk for _fetch_pages; connection errors are retried by the decorator
+        
+        Args:
+            table_name: Physical table name
+            after_row_number: Start after this original_row_number
+        
+        Returns:
+            Up to RPC_PAGE_SIZE row dictionaries
+        """
+        response = self.client.rpc('get_all_rows', {
+            'tbl': table_name,
+            'after_row_number': after_row_number,
+            'lim': RPC_PAGE_SIZE
+        }).execute()
+        return response.data or []
+    
     def get_all_included_data(self, table_name: str, sheet_identifier: str, 
                              batch_size: int = 1000) -> List[Dict[str, Any]]:
         """
@@ -715,30 +1597,10 @@ class SupabaseManager:
         Returns:
             List of all dictionaries containing the data
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_included"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
         
         try:
-            all_data = []
-            offset = 0
-            
-            while True:
-                response = self.client.table(safe_table_name)\
-                    .select("*")\
-                    .order('original_row_number')\
-                    .range(offset, offset + batch_size - 1)\
-                    .execute()
-                
-                batch_data = response.data
-                
-                if not batch_data:
-                    break
-                
-                all_data.extend(batch_data)
-                
-                if len(batch_data) < batch_size:
-                    break
-                
-                offset += batch_size
+            all_data = list(chain.from_iterable(self._fetch_pages(safe_table_name, batch_size)))
             
             logger.info(f"Retrieved {len(all_data):,} included rows from {safe_table_name}")
             return all_data
@@ -747,6 +1609,26 @@ class SupabaseManager:
             logger.error(f"Error retrieving all included data: {str(e)}")
             return []
     
+    def iter_included_data(self, table_name: str, sheet_identifier: str,
+                           batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over ALL included data, fetching one page at a time
+        
+        Memory stays at one page regardless of table size; prefer this over
+        get_all_included_data when the rows are only counted, written out or re-uploaded.
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            batch_size: Number of rows to fetch per page
+        
+        Yields:
+            Row dictionaries in original_row_number order
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
+        for page in self._fetch_pages(safe_table_name, batch_size):
+            yield from page
+    
     def get_all_excluded_data(self, table_name: str, sheet_identifier: str,
                              batch_size: int = 1000) -> List[Dict[str, Any]]:
         """
@@ -760,30 +1642,10 @@ class SupabaseManager:
         Returns:
             List of all dictionaries containing the data
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_excluded"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
         
         try:
-            all_data = []
-            offset = 0
-            
-            while True:
-                response = self.client.table(safe_table_name)\
-                    .select("*")\
-                    .order('original_row_number')\
-                    .range(offset, offset + batch_size - 1)\
-                    .execute()
-                
-                batch_data = response.data
-                
-                if not batch_data:
-                    break
-                
-                all_data.extend(batch_data)
-                
-                if len(batch_data) < batch_size:
-                    break
-                
-                offset += batch_size
+            all_data = list(chain.from_iterable(self._fetch_pages(safe_table_name, batch_size)))
             
             logger.info(f"Retrieved {len(all_data):,} excluded rows from {safe_table_name}")
             return all_data
@@ -791,6 +1653,26 @@ class SupabaseManager:
         except Exception as e:
             logger.error(f"Error retrieving all excluded data: {str(e)}")
             return []
+    
+    def iter_excluded_data(self, table_name: str, sheet_identifier: str,
+                           batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily iterate over ALL excluded data, fetching one page at a time
+        
+        Memory stays at one page regardless of table size; prefer this over
+        get_all_excluded_data when the rows are only counted, written out or re-uploaded.
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            batch_size: Number of rows to fetch per page
+        
+        Yields:
+            Row dictionaries in original_row_number order
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        for page in self._fetch_pages(safe_table_name, batch_size):
+            yield from page
         
     
     # =========================
@@ -798,7 +1680,10 @@ class SupabaseManager:
     # =========================
     
     def get_all_included_data_parallel(self, table_name: str, sheet_identifier: str, 
-                                      batch_size: int = 1000, max_workers: int = 10) -> List[Dict[str, Any]]:
+                                      batch_size: int = 1000, max_workers: int = 10,
+                                      count_exact: bool = False,
+                                      output: str = 'rows',
+                                      total_count: Optional[int] = None) -> Union[List[Dict[str, Any]], 'pa.Table', LazyRowList]:
         """
         Retrieve ALL included data using PARALLEL fetching (much faster!)
         
@@ -806,73 +1691,25 @@ class SupabaseManager:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             batch_size: Rows per batch (default 1000)
-            max_workers: Parallel workers (default 10)
+            max_workers: Most concurrent page requests; the actual level adapts to latency (default 10)
+            count_exact: Size offset pages from an exact COUNT instead of the planner estimate
+            output: 'rows' for a list of dicts, 'arrow' for a pyarrow.Table (pages fetched as CSV),
+                or 'lazy' for a LazyRowList that builds row dicts only on access
+            total_count: Row count already known to the caller (e.g. from get_sheet_counts)
         
         Returns:
-            List of all data
+            List of all data, a pyarrow.Table when output='arrow' (.to_pylist() gives rows),
+            or a LazyRowList when output='lazy'
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_included"
-        
-        try:
-            # Step 1: Get total count
-            count_response = self.client.table(safe_table_name).select("*", count='exact').limit(1).execute()
-            total_count = count_response.count or 0
-            
-            if total_count == 0:
-                return []
-            
-            logger.info(f"Fetching {total_count:,} included rows in parallel...")
-            
-            # Step 2: Calculate batches
-            num_batches = (total_count + batch_size - 1) // batch_size
-            
-            # Step 3: Fetch in parallel
-            def fetch_batch(batch_num):
-                offset = batch_num * batch_size
-                try:
-                    client = create_client(self.url, self.key)
-                    response = client.table(safe_table_name)\
-                        .select("*")\
-                        .order('original_row_number')\
-                        .range(offset, offset + batch_size - 1)\
-                        .execute()
-                    return (batch_num, response.data)
-                except Exception as e:
-                    logger.error(f"Error fetching batch {batch_num}: {str(e)}")
-                    return (batch_num, [])
-            
-            start_time = time.time()
-            all_data = [None] * num_batches
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {executor.submit(fetch_batch, i): i for i in range(num_batches)}
-                
-                completed = 0
-                for future in as_completed(future_to_batch):
-                    batch_num, batch_data = future.result()
-                    all_data[batch_num] = batch_data
-                    completed += 1
-                    
-                    if completed % 100 == 0:
-                        logger.info(f"Progress: {completed}/{num_batches} batches")
-            
-            # Flatten
-            flattened = []
-            for batch in all_data:
-                if batch:
-                    flattened.extend(batch)
-            
-            elapsed = time.time() - start_time
-            logger.info(f"✓ Fetched {len(flattened):,} rows in {elapsed:.1f}s ({len(flattened)/elapsed:.0f} rows/sec)")
-            
-            return flattened
-        
-        except Exception as e:
-            logger.error(f"Error retrieving data: {str(e)}")
-            return []
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
+        return self._fetch_parallel(safe_table_name, batch_size, max_workers, 'included', count_exact, output,
+                                    total_count)
     
     def get_all_excluded_data_parallel(self, table_name: str, sheet_identifier: str,
-                                      batch_size: int = 1000, max_workers: int = 10) -> List[Dict[str, Any]]:
+                                      batch_size: int = 1000, max_workers: int = 10,
+                                      count_exact: bool = False,
+                                      output: str = 'rows',
+                                      total_count: Optional[int] = None) -> Union[List[Dict[str, Any]], 'pa.Table', LazyRowList]:
         """
         Retrieve ALL excluded data using PARALLEL fetching (much faster!)
         
@@ -880,57 +1717,310 @@ class SupabaseManager:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             batch_size: Rows per batch (default 1000)
-            max_workers: Parallel workers (default 10)
+            max_workers: Most concurrent page requests; the actual level adapts to latency (default 10)
+            count_exact: Size offset pages from an exact COUNT instead of the planner estimate
+            output: 'rows' for a list of dicts, 'arrow' for a pyarrow.Table (pages fetched as CSV),
+                or 'lazy' for a LazyRowList that builds row dicts only on access
+            total_count: Row count already known to the caller (e.g. from get_sheet_counts)
         
         Returns:
-            List of all data
+            List of all data, a pyarrow.Table when output='arrow' (.to_pylist() gives rows),
+            or a LazyRowList when output='lazy'
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_excluded"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        return self._fetch_parallel(safe_table_name, batch_size, max_workers, 'excluded', count_exact, output,
+                                    total_count)
+    
+    def get_all_original_data_parallel(self, table_name: str, sheet_identifier: str,
+                                      batch_size: int = 1000, max_workers: int = 10,
+                                      count_exact: bool = False,
+                                      output: str = 'rows',
+                                      total_count: Optional[int] = None) -> Union[List[Dict[str, Any]], 'pa.Table', LazyRowList]:
+        """
+        Retrieve ALL original data using PARALLEL fetching
         
-        try:
-            count_response = self.client.table(safe_table_name).select("*", count='exact').limit(1).execute()
-            total_count = count_response.count or 0
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            batch_size: Rows per batch (default 1000)
+            max_workers: Most concurrent page requests; the actual level adapts to latency (default 10)
+            count_exact: Size offset pages from an exact COUNT instead of the planner estimate
+            output: 'rows' for a list of dicts, 'arrow' for a pyarrow.Table (pages fetched as CSV),
+                or 'lazy' for a LazyRowList that builds row dicts only on access
+            total_count: Row count already known to the caller (e.g. from get_sheet_counts)
+        
+        Returns:
+            List of all data, a pyarrow.Table when output='arrow' (.to_pylist() gives rows),
+            or a LazyRowList when output='lazy'
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'original')
+        return self._fetch_parallel(safe_table_name, batch_size, max_workers, 'original', count_exact, output,
+                                    total_count)
+    
+    @staticmethod
+    def _range_params(lo: int, hi: int) -> List[tuple]:
+        """
+        Query parameters for rows lo..hi (inclusive positions) in original_row_number order
+        
+        Args:
+            lo: First row position
+            hi: Last row position
+        
+        Returns:
+            PostgREST query parameters
+        """
+        # The order is what makes offset windows disjoint and stable between requests;
+        # idx_<table>_row_number serves it, so there is no sort node in the plan
+        return [
+            ('select', '*'),
+            ('order', 'original_row_number'),
+            ('offset', lo),
+            ('limit', hi - lo + 1),
+        ]
+    
+    @staticmethod
+    def _window_params(lo: int, hi: Optional[int]) -> List[tuple]:
+        """
+        Query parameters for rows with lo <= original_row_number < hi (an index range scan, no OFFSET)
+        
+        Args:
+            lo: Smallest original_row_number to include
+            hi: original_row_number to stop before, or None for the rest of the table
+        
+        Returns:
+            PostgREST query parameters
+        """
+        # Windows are already disjoint; the order only fixes row order inside the page, and
+        # with the bounds on the same indexed column it comes free from the index range scan
+        params = [
+            ('select', '*'),
+            ('order', 'original_row_number'),
+            ('original_row_number', f'gte.{lo}'),
+        ]
+        if hi is not None:
+            params.append(('original_row_number', f'lt.{hi}'))
+        return params
+    
+    async def _fetch_pages_async(self, table_name: str, page_params: List[List[tuple]],
+                                 max_concurrency: int, as_csv: bool = False) -> List[Any]:
+        """
+        Fetch every page concurrently on one event loop over multiplexed HTTP/2 connections
+        
+        Concurrency starts at 4 requests and is tuned between 2 (or
+        max_concurrency, if lower) and max_concurrency from measured page
+        latency (see _AdaptiveLimiter).
+        The async client is opened per call because it is bound to the event
+        loop that asyncio.run creates for this fetch.
+        
+        Args:
+            table_name: Physical table name
+            page_params: Query parameters of each page, in order
+            max_concurrency: Upper bound on requests in flight at once
+            as_csv: Request text/csv and parse each page into a pyarrow.Table
+        
+        Returns:
+            Pages in the same order as page_params (a failed page is empty, or None for CSV)
+        """
+        limiter = _AdaptiveLimiter(initial=4, minimum=min(2, max_concurrency), maximum=max_concurrency)
+        headers = {'Accept': 'text/csv'} if as_csv else None
+        num_batches = len(page_params)
+        completed = 0
+        
+        async with httpx.AsyncClient(
+            base_url=self._rest_url,
+            headers=self._auth_headers,
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        ) as client:
+            
+            async def fetch_batch(batch_num, params):
+                nonlocal completed
+                async with limiter.slot():
+                    try:
+                        response = await client.get(f"/{table_name}", params=params, headers=headers)
+                        response.raise_for_status()
+                        if not as_csv:
+                            page = _json_loads(response.content)
+                        elif response.content.strip():
+                            page = _arrow_from_csv(response.content)
+                        else:
+                            page = None
+                    except Exception as e:
+                        logger.error(f"Error fetching batch {batch_num}: {str(e)}")
+                        page = None if as_csv else []
+                
+                completed += 1
+                if completed % 100 == 0:
+                    logger.info(f"Progress: {completed}/{num_batches} batches")
+                return page
             
+            pages = await asyncio.gather(*(fetch_batch(i, params) for i, params in enumerate(page_params)))
+        
+        logger.info(f"Page fetch concurrency settled at {limiter.capacity}")
+        return pages
+    
+    def _page_bounds(self, table_name: str, page_size: int) -> Optional[List[int]]:
+        """
+        First original_row_number of every page, from the page_bounds RPC
+        
+        Args:
+            table_name: Physical table name
+            page_size: Rows per page
+        
+        Returns:
+            Page start values in order, or None if the RPC is unavailable
+        """
+        if not self.use_rpc_fetch:
+            return None
+        
+        try:
+            response = self.client.rpc('page_bounds', {'tbl': table_name, 'page_size': page_size}).execute()
+        except Exception as e:
+            logger.warning(f"page_bounds RPC unavailable, using offset pages: {e}")
+            return None
+        return response.data or []
+    
+    def _has_rows(self, table_name: str) -> bool:
+        """
+        Check whether a table has at least one row (LIMIT 1, stops at the first row found)
+        
+        Args:
+            table_name: Physical table name
+        
+        Returns:
+            bool: True if the table is not empty
+        """
+        response = self._http.get(f"/{table_name}", params={'select': 'row_id', 'limit': 1})
+        response.raise_for_status()
+        return bool(_json_loads(response.content))
+    
+    def _count_rows(self, table_name: str, count_method: str = 'exact') -> Optional[int]:
+        """
+        Row count from a HEAD request's Content-Range header (no rows transferred)
+        
+        Args:
+            table_name: Physical table name
+            count_method: 'exact' runs COUNT(*); 'estimated' uses the planner's
+                row estimate (pg_class statistics) once the table is large
+        
+        Returns:
+            Row count, or None if the server did not report one
+        """
+        response = self._http.head(f"/{table_name}", params={'select': 'row_id'},
+                                   headers={'Prefer': f'count={count_method}'})
+        response.raise_for_status()
+        
+        # Content-Range looks like "0-24/3573" or "*/0"
+        total = response.headers.get('content-range', '').rpartition('/')[2]
+        return int(total) if total.isdigit() else None
+    
+    def _fetch_parallel(self, table_name: str, batch_size: int, max_workers: int, label: str,
+                        count_exact: bool = False, output: str = 'rows',
+                        total_count: Optional[int] = None) -> Union[List[Dict[str, Any]], 'pa.Table', LazyRowList]:
+        """
+        Fetch a whole table with concurrent page requests on an asyncio event loop
+        
+        Page windows are laid out on original_row_number values from the
+        page_bounds RPC, so every request is an index range scan. Without the
+        RPC, windows are row offsets sized from the planner's row estimate
+        (padded by 10%), and a full last page means the estimate was low, so the
+        rest is read sequentially after it. When no count is available at all,
+        reads sequentially with keyset pagination instead.
+        
+        Args:
+            table_name: Physical table name
+            batch_size: Rows per page
+            max_workers: Upper bound on page requests in flight at once
+            label: Table kind for log messages
+            count_exact: Size offset pages from an exact COUNT(*) instead of the estimate
+            output: 'rows' for a list of dicts, 'arrow' for a pyarrow.Table, 'lazy' for a LazyRowList
+            total_count: Exact row count from the caller, used instead of a count request
+        
+        Returns:
+            All rows in original_row_number order, as a list, a pyarrow.Table or a LazyRowList
+        """
+        if output in ('arrow', 'lazy') and pa is None:
+            raise ImportError(f"pyarrow is required for output='{output}'")
+        
+        if output == 'lazy':
+            table = self._fetch_parallel(table_name, batch_size, max_workers, label, count_exact, 'arrow',
+                                         total_count)
+            return LazyRowList(table) if isinstance(table, pa.Table) else table
+        
+        as_arrow = output == 'arrow'
+        
+        try:
             if total_count == 0:
-                return []
-            
-            logger.info(f"Fetching {total_count:,} excluded rows in parallel...")
+                return _arrow_from_rows([]) if as_arrow else []
+            
+            # Step 1: Lay out page windows
+            bounds = self._page_bounds(table_name, batch_size)
+            estimated = False
+            
+            if bounds is not None:
+                windows = list(zip(bounds, bounds[1:] + [None]))
+                window_params = self._window_params
+            else:
+                if total_count is None:
+                    if count_exact and not self._has_rows(table_name):
+                        return _arrow_from_rows([]) if as_arrow else []
+                    total_count = self._count_rows(table_name, 'exact' if count_exact else 'estimated')
+                else:
+                    count_exact = True
+                
+                if total_count is None:
+                    logger.info(f"Row count unavailable for {table_name}, fetching sequentially...")
+                    rows = list(chain.from_iterable(self._fetch_pages(table_name, batch_size)))
+                    return _arrow_from_rows(rows) if as_arrow else rows
+                
+                if not count_exact:
+                    # Statistics can lag behind the table; pad them and always probe at least one page
+                    estimated = True
+                    total_count = max(1, -(-total_count * 11 // 10))
+                
+                windows = [(offset, offset + batch_size - 1) for offset in range(0, total_count, batch_size)]
+                window_params = self._range_params
             
-            num_batches = (total_count + batch_size - 1) // batch_size
+            if not windows:
+                return _arrow_from_rows([]) if as_arrow else []
             
-            def fetch_batch(batch_num):
-                offset = batch_num * batch_size
-                try:
-                    client = create_client(self.url, self.key)
-                    response = client.table(safe_table_name)\
-                        .select("*")\
-                        .order('original_row_number')\
-                        .range(offset, offset + batch_size - 1)\
-                        .execute()
-                    return (batch_num, response.data)
-                except Exception as e:
-                    logger.error(f"Error fetching batch {batch_num}: {str(e)}")
-                    return (batch_num, [])
+            num_batches = len(windows)
+            logger.info(f"Fetching {label} rows in {num_batches:,} parallel pages...")
             
+            # Step 2: Fetch in parallel
             start_time = time.time()
-            all_data = [None] * num_batches
-            
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_batch = {executor.submit(fetch_batch, i): i for i in range(num_batches)}
-                
-                completed = 0
-                for future in as_completed(future_to_batch):
-                    batch_num, batch_data = future.result()
-                    all_data[batch_num] = batch_data
-                    completed += 1
-                    
-                    if completed % 100 == 0:
-                        logger.info(f"Progress: {completed}/{num_batches} batches")
-            
-            flattened = []
-            for batch in all_data:
-                if batch:
-                    flattened.extend(batch)
+            all_data = asyncio.run(self._fetch_pages_async(
+                table_name, [window_params(*window) for window in windows], max_workers, as_csv=as_arrow
+            ))
+            
+            # A full last page means the estimate fell short; read the rest after it
+            last_page = all_data[-1]
+            tail = []
+            if estimated and last_page and len(last_page) == batch_size:
+                logger.info(f"Row estimate for {table_name} was low, reading the remaining rows sequentially...")
+                if as_arrow:
+                    last_row_number = last_page.column('original_row_number')[-1].as_py()
+                else:
+                    last_row_number = last_page[-1]['original_row_number']
+                tail = list(chain.from_iterable(
+                    self._fetch_pages(table_name, batch_size, after_row_number=last_row_number)
+                ))
+            
+            if as_arrow:
+                # One contiguous buffer per column instead of a dict per row
+                tables = [page for page in all_data if page]
+                if tail:
+                    tables.append(_arrow_from_rows(tail))
+                flattened = pa.concat_tables(tables, promote_options='permissive') if tables else _arrow_from_rows([])
+            else:
+                # Flatten into a list allocated once at its final size instead of growing it page by page
+                all_data.append(tail)
+                flattened = [None] * sum(map(len, all_data))
+                position = 0
+                for batch in all_data:
+                    flattened[position:position + len(batch)] = batch
+                    position += len(batch)
             
             elapsed = time.time() - start_time
             logger.info(f"✓ Fetched {len(flattened):,} rows in {elapsed:.1f}s ({len(flattened)/elapsed:.0f} rows/sec)")
@@ -939,129 +2029,206 @@ class SupabaseManager:
         
         except Exception as e:
             logger.error(f"Error retrieving data: {str(e)}")
-            return []
+            return _arrow_from_rows([]) if as_arrow else []
 
     
+    # =========================
+    # DATABASE-SIDE AGGREGATES
+    # =========================
+    
+    def get_included_stats(self, table_name: str, sheet_identifier: str,
+                           columns: Iterable[str] = ('birth_month', 'birth_year')) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Value counts for included-table columns, computed in the database
+        
+        Use this instead of Counter(r['birth_month'] for r in get_all_included_data(...)):
+        only one row per distinct value crosses the wire.
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            columns: Columns to group by (any of STATS_COLUMNS)
+        
+        Returns:
+            Dict mapping each column to a list of {'value': ..., 'count': ...} sorted by value
+        """
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, 'included')
+        
+        stats = {}
+        for column in columns:
+            if column not in STATS_COLUMNS:
+                raise ValueError(f"Unsupported stats column: {column}")
+            try:
+                response = self.client.rpc('sheet_stats', {'tbl': safe_table_name, 'col': column}).execute()
+                stats[column] = response.data or []
+            except Exception as e:
+                logger.error(f"Error computing {column} stats for {safe_table_name}: {str(e)}")
+                stats[column] = []
+        
+        return stats
+    
+    def get_sheet_counts(self, table_name: str, sheet_identifier: str) -> tuple[int, int]:
+        """
+        Included and excluded row counts of a sheet from one sheet_counts RPC call
+        
+        Pass the results as total_count to the parallel fetchers when fetching
+        both tables, so neither has to count on its own.
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+        
+        Returns:
+            Tuple of (included_count, excluded_count)
+        """
+        included_table = sheet_table_name(table_name, sheet_identifier, 'included')
+        excluded_table = sheet_table_name(table_name, sheet_identifier, 'excluded')
+        
+        try:
+            response = self.client.rpc('sheet_counts', {
+                'included_tbl': included_table,
+                'excluded_tbl': excluded_table
+            }).execute()
+            counts = response.data or {}
+            return (counts.get('included', 0), counts.get('excluded', 0))
+        except Exception as e:
+            logger.warning(f"sheet_counts RPC unavailable, counting each table: {e}")
+            return (self._count_rows(included_table) or 0, self._count_rows(excluded_table) or 0)
+    
     # =========================
     # UTILITY METHODS
     # =========================
     
-    def count_records(self, table_name: str, sheet_identifier: str, table_type: str = 'included') -> int:
+    def clear_table(self, table_name: str, sheet_identifier: str, table_type: str = 'included',
+                    truncate: bool = True) -> None:
+        """
+        Remove every row from a sheet table
+        
+        Args:
+            table_name: Base table name
+            sheet_identifier: Sheet identifier
+            table_type: 'original', 'included' or 'excluded'
+            truncate: Use TRUNCATE (O(1), skips ON DELETE triggers) instead of DELETE
+        """
+        self._clear_table(sheet_table_name(table_name, sheet_identifier, table_type), truncate)
+    
+    def _clear_table(self, table_name: str, truncate: bool = True) -> None:
+        """
+        Remove every row from a physical table
+        
+        Args:
+            table_name: Physical table name
+            truncate: Use TRUNCATE instead of DELETE
+        """
+        logger.info(f"Clearing existing data from {table_name}...")
+        if truncate:
+            # Metadata-only, unlike DELETE which scans, logs and de-indexes every row
+            self.client.rpc('execute_sql', {'query': f'TRUNCATE TABLE {table_name} RESTART IDENTITY;'}).execute()
+        else:
+            # return=minimal: don't ship every deleted row back over the wire
+            self.client.table(table_name).delete(returning='minimal')\
+                .neq('row_id', '00000000-0000-0000-0000-000000000000').execute()
+    
+    def count_records(self, table_name: str, sheet_identifier: str, table_type: str = 'included',
+                      count_method: str = 'planned') -> int:
         """
         Count records in a table with retry logic
         
+        The default 'planned' count comes from the planner's row estimate and
+        costs O(1); pass count_method='exact' when the number must be precise.
+        An exact count first checks for a single row, so an empty table is
+        answered without running COUNT(*).
+        
         Args:
             table_name: Base table name
             sheet_identifier: Sheet identifier
             table_type: 'original', 'included' or 'excluded'
+            count_method: PostgREST count method ('planned', 'estimated' or 'exact')
         
         Returns:
             int: Number of records
         """
-        safe_table_name = f"{table_name.lower().replace(' ', '_').replace('-', '_')}_{sheet_identifier}_{table_type}"
+        safe_table_name = sheet_table_name(table_name, sheet_identifier, table_type)
         
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Create fresh client for each attempt
-                client = create_client(self.url, self.key)
-                response = client.table(safe_table_name).select("*", count='exact').execute()
-                return response.count or 0
-            
-            except Exception as e:
-                error_str = str(e)
-                
-                # If table doesn't exist, return 0 immediately
-                if 'PGRST205' in error_str or 'not find the table' in error_str or '404' in error_str:
-                    logger.debug(f"Table {safe_table_name} does not exist yet")
-                    return 0
-                
-                # If connection error, retry
-                if 'WinError 10054' in error_str or 'connection' in error_str.lower():
-                    if attempt < max_retries - 1:
-                        wait_time = (attempt + 1) * 2
-                        logger.warning(f"Connection error counting {safe_table_name}, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        logger.error(f"Failed to count records after {max_retries} attempts: {error_str}")
-                        return 0
-                else:
-                    logger.error(f"Error counting records in {safe_table_name}: {error_str}")
-                    return 0
+        try:
+            return self._do_count(safe_table_name, count_method)
+        except TableMissing:
+            logger.debug(f"Table {safe_table_name} does not exist yet")
+            return 0
+        except Exception as e:
+            logger.error(f"Error counting records in {safe_table_name}: {str(e)}")
+            return 0
+    
+    @_retry_with_backoff()
+    def _do_count(self, table_name: str, count_method: str) -> int:
+        """
+        One count attempt for count_records; connection errors are retried by the decorator
+        
+        Args:
+            table_name: Physical table name
+            count_method: PostgREST count method ('planned', 'estimated' or 'exact')
         
-        return 0
+        Returns:
+            int: Number of records
+        """
+        try:
+            client = self._thread_client()
+            if count_method == 'exact' and not client.table(table_name).select("row_id").limit(1).execute().data:
+                return 0
+            response = client.table(table_name).select("row_id", count=count_method, head=True).execute()
+            return response.count or 0
+        
+        except Exception as e:
+            error_str = str(e)
+            if 'PGRST205' in error_str or 'not find the table' in error_str or '404' in error_str:
+                raise TableMissing(table_name) from e
+            if _is_connection_error(e):
+                # Drop the broken client so the retry reconnects
+                self._thread_local.client = None
+            raise
     
     def count_included_records(self, table_name: str, sheet_identifier: str) -> int:
         """Count included records using direct PostgreSQL query"""
-        connection = None
-        cursor = None
         try:
-            connection = psycopg2.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            cursor.execute(
-                f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s AND is_excluded = FALSE",
-                (sheet_identifier,)
-            )
-            count = cursor.fetchone()[0]
-            return count
+            with self._db_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s AND is_excluded = FALSE",
+                        (sheet_identifier,)
+                    )
+                    return cursor.fetchone()[0]
             
         except Exception as e:
             logger.error(f"Error counting included records: {e}")
             return 0
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     def count_excluded_records(self, table_name: str, sheet_identifier: str) -> int:
         """Count excluded records using direct PostgreSQL query"""
-        connection = None
-        cursor = None
         try:
-            connection = psycopg2.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            cursor.execute(
-                f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s AND is_excluded = TRUE",
-                (sheet_identifier,)
-            )
-            count = cursor.fetchone()[0]
-            return count
+            with self._db_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s AND is_excluded = TRUE",
+                        (sheet_identifier,)
+                    )
+                    return cursor.fetchone()[0]
             
         except Exception as e:
             logger.error(f"Error counting excluded records: {e}")
             return 0
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
 
     def count_total_records(self, table_name: str, sheet_identifier: str) -> int:
         """Count total records using direct PostgreSQL query"""
-        connection = None
-        cursor = None
         try:
-            connection = psycopg2.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            
-            cursor.execute(
-                f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s",
-                (sheet_identifier,)
-            )
-            count = cursor.fetchone()[0]
-            return count
+            with self._db_connection() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"SELECT COUNT(*) FROM {table_name} WHERE sheet_identifier = %s",
+                        (sheet_identifier,)
+                    )
+                    return cursor.fetchone()[0]
             
         except Exception as e:
             logger.error(f"Error counting total records: {e}")
             return 0
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
-        return 0
             
@@ -1,9 +1,17 @@
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
+import psycopg2.pool
+from psycopg2 import sql
+import hashlib
 import logging
 from dotenv import load_dotenv
 import os
 import time
+import threading
+from contextlib import contextmanager
+from typing import Optional
+from .supabase_data import TRANSACTION_POOLER, sheet_table_name
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,10 +25,73 @@ DB_CONFIG = {
     'host': os.getenv('DB_HOST'),
     'port': os.getenv('DB_PORT', '5432'),
     'dbname': os.getenv('DB_NAME', 'postgres'),
-    'sslmode': 'require'
+    'sslmode': 'require',
+    'application_name': 'cleaning_pipeline',
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10
 }
 
 
+class _PreparedConnection(psycopg2.extensions.connection):
+    """Connection that remembers which statements it has PREPAREd (they live as long as the session)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+# Shared connection pool, opened on first use so importing this module never connects.
+# putconn closes connections returned beyond minconn, so the pool keeps all of them open
+# (which also keeps each connection's prepared statements alive between requests)
+_POOL_SIZE = 10
+_POOL = None
+_POOL_LOCK = threading.Lock()
+# getconn raises instead of waiting once every connection is out, so borrowers queue here first
+_POOL_SLOTS = threading.BoundedSemaphore(_POOL_SIZE)
+
+
+@contextmanager
+def _conn():
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = psycopg2.pool.ThreadedConnectionPool(_POOL_SIZE, _POOL_SIZE,
+                                                             connection_factory=_PreparedConnection,
+                                                             **DB_CONFIG)
+
+    with _POOL_SLOTS:
+        connection = _POOL.getconn()
+        if connection.closed:
+            # Already known to be dead; swap in a fresh connection before handing it out
+            _POOL.putconn(connection, close=True)
+            connection = _POOL.getconn()
+
+        discard = False
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            if connection.closed:
+                # The session is gone (e.g. closed by the server while idle); don't return it to the pool
+                discard = True
+                raise
+            connection.rollback()
+            if connection.prepared:
+                # A prepared plan may point at a dropped or altered table; start over on the next call
+                connection.prepared.clear()
+                try:
+                    with connection.cursor() as cursor:
+                        cursor.execute("DEALLOCATE ALL")
+                    connection.commit()
+                except psycopg2.Error:
+                    connection.rollback()
+            raise
+        finally:
+            _POOL.putconn(connection, close=discard)
+
+
 class SupabaseManagerSQL:
     """PostgreSQL manager mimicking the original SupabaseManager sheet_identifier handling"""
 
@@ -30,63 +101,116 @@ class SupabaseManagerSQL:
     # ----------------------
     # FETCH RECORDS
     # ----------------------
-    def get_records(self, sheet_identifier: str, limit: int = 100, offset: int = 0, excluded=False):
-        table_name = f"{self.base_table}_{sheet_identifier}"
-        table_name += "_excluded" if excluded else "_included"
-
-        connection = None
-        cursor = None
+    def get_records(self, sheet_identifier: str, limit: int = 100, offset: int = 0, excluded=False,
+                    after_id: Optional[int] = None):
         try:
-            connection = psycopg2.connect(**DB_CONFIG)
-            cursor = connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-            cursor.execute(
-                f"""
-                SELECT *
-                FROM {table_name}
-                ORDER BY id
-                LIMIT %s OFFSET %s
-                """,
-                (limit, offset)
-            )
-            return cursor.fetchall()
+            return list(self.iter_records(sheet_identifier, limit, offset, excluded, after_id))
         except Exception as e:
-            logger.error(f"Error fetching records from {table_name}: {e}")
+            logger.error(f"Error fetching records for sheet {sheet_identifier}: {e}")
             return []
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()
+
+    def iter_records(self, sheet_identifier: str, limit: int = 100, offset: int = 0, excluded=False,
+                     after_id: Optional[int] = None, chunk: int = 1000):
+        table_name = sheet_table_name(self.base_table, sheet_identifier, 'excluded' if excluded else 'included')
+
+        # Keyset page when the caller passes the last id it saw, so deep pages don't scan the OFFSET
+        if after_id is not None:
+            query = "SELECT * FROM {} WHERE id > $1 ORDER BY id LIMIT $2"
+            params = (after_id, limit)
+            prefix = "get_records_after"
+        else:
+            query = "SELECT * FROM {} ORDER BY id LIMIT $1 OFFSET $2"
+            params = (limit, offset)
+            prefix = "get_records"
+
+        # One prepared plan per table and connection; the name is a digest so it fits in 63 bytes
+        statement_name = f"{prefix}_{hashlib.md5(table_name.encode()).hexdigest()[:16]}"
+
+        # Errors propagate: rows may already have been handed out, so swallowing one would truncate the page
+        with _conn() as connection:
+            with connection.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                if TRANSACTION_POOLER:
+                    # No session to keep a PREPARE in, so run the statement directly
+                    cursor.execute(
+                        sql.SQL(query.replace('$1', '%s').replace('$2', '%s')).format(sql.Identifier(table_name)),
+                        params
+                    )
+                else:
+                    if statement_name not in connection.prepared:
+                        cursor.execute(
+                            sql.SQL("PREPARE {} AS ").format(sql.Identifier(statement_name))
+                            + sql.SQL(query).format(sql.Identifier(table_name))
+                        )
+                        connection.prepared.add(statement_name)
+                    cursor.execute(
+                        sql.SQL("EXECUTE {} (%s, %s)").format(sql.Identifier(statement_name)),
+                        params
+                    )
+                # Hand rows out chunk at a time instead of building one list of the whole page
+                while True:
+                    rows = cursor.fetchmany(chunk)
+                    if not rows:
+                        break
+                    yield from rows
+
+    def stream_records(self, sheet_identifier: str, excluded=False, itersize: int = 10000):
+        table_name = sheet_table_name(self.base_table, sheet_identifier, 'excluded' if excluded else 'included')
+
+        # Named (server-side) cursor: rows arrive itersize at a time instead of all at once
+        try:
+            with _conn() as connection:
+                with connection.cursor(name=f"stream_{table_name}",
+                                       cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+                    cursor.itersize = itersize
+                    cursor.execute(
+                        sql.SQL("SELECT * FROM {} ORDER BY original_row_number").format(sql.Identifier(table_name))
+                    )
+                    yield from cursor
+        except Exception as e:
+            # Re-raise: rows may already have been handed out, so ending quietly would look like a complete table
+            logger.error(f"Error streaming records from {table_name}: {e}")
+            raise
 
     # ----------------------
     # COUNT RECORDS
     # ----------------------
     def count_included_records(self, sheet_identifier: str) -> int:
-        table_name = f"{self.base_table}_{sheet_identifier}_included"
+        table_name = sheet_table_name(self.base_table, sheet_identifier, 'included')
         return self._count_records(table_name)
 
     def count_excluded_records(self, sheet_identifier: str) -> int:
-        table_name = f"{self.base_table}_{sheet_identifier}_excluded"
+        table_name = sheet_table_name(self.base_table, sheet_identifier, 'excluded')
         return self._count_records(table_name)
 
     def count_total_records(self, sheet_identifier: str) -> int:
-        included = self.count_included_records(sheet_identifier)
-        excluded = self.count_excluded_records(sheet_identifier)
+        included, excluded = self.count_split_records(sheet_identifier)
         return included + excluded
 
+    def count_split_records(self, sheet_identifier: str) -> tuple:
+        included_table = sheet_table_name(self.base_table, sheet_identifier, 'included')
+        excluded_table = sheet_table_name(self.base_table, sheet_identifier, 'excluded')
+
+        # Both counts in one round trip
+        try:
+            with _conn() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        sql.SQL("SELECT (SELECT COUNT(*) FROM {}), (SELECT COUNT(*) FROM {})").format(
+                            sql.Identifier(included_table), sql.Identifier(excluded_table)
+                        )
+                    )
+                    included, excluded = cursor.fetchone()
+                    return included, excluded
+        except Exception as e:
+            logger.error(f"Error counting records for sheet {sheet_identifier}: {e}")
+            return 0, 0
+
     def _count_records(self, table_name: str) -> int:
-        connection = None
-        cursor = None
         try:
-            connection = psycopg2.connect(**DB_CONFIG)
-            cursor = connection.cursor()
-            cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-            return cursor.fetchone()[0]
+            with _conn() as connection:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(sql.Identifier(table_name)))
+                    return cursor.fetchone()[0]
         except Exception as e:
             logger.error(f"Error counting records in {table_name}: {e}")
             return 0
-        finally:
-            if cursor:
-                cursor.close()
-            if connection:
-                connection.close()